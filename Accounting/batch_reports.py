@@ -0,0 +1,48 @@
+from Accounting.classes.exercise_report import ExerciseReport
+from Accounting.classes.money import Money
+from Accounting.storage.storage import open_storage
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import os
+
+
+def report_exercise(backend: str, path: str, name: str, as_of: datetime = None) -> ExerciseReport:
+    # Runs in a worker process, which opens its own storage and only reads the exercise it reports
+    storage = open_storage(backend, path)
+
+    try:
+        return storage.read_exercise(name).report(as_of)
+    finally:
+        storage.close()
+
+
+def report_exercises(backend: str, path: str, names: list[str] = None, workers: int = None, as_of: datetime = None) -> list[ExerciseReport]:
+    storage = open_storage(backend, path)
+
+    try:
+        catalog = [entry.name for entry in storage.catalog()]
+    finally:
+        storage.close()
+
+    if names is None:
+        names = catalog
+    else:
+        for name in names:
+            if name not in catalog:
+                raise Exception("ERROR: Exercise '" + name + "' doesn't exist.")
+
+    if len(names) == 0:
+        return []
+
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(names))) as executor:
+        return list(executor.map(report_exercise, [backend] * len(names), [path] * len(names), names, [as_of] * len(names)))
+
+
+def consolidate(reports: list[ExerciseReport]) -> list[Money]:
+    res = [Money(0)] * 5
+
+    for report in reports:
+        res = [total + balance for total, balance in zip(res, report.balances)]
+
+    return res
@@ -0,0 +1,295 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.exercise import STATEMENTS, Exercise
+from Accounting.classes.money import Money
+from Accounting.classes.policy import Policy
+from Accounting.storage.storage import open_storage
+
+from Accounting.settings import company_name, snapshot_interval
+
+from argparse import ArgumentParser
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
+import json
+import math
+import os
+import pickle
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def generate_accounts(exercise: Exercise, accounts_per_statement: int) -> list[int]:
+    lst = []
+
+    for number, (name, nature) in enumerate(STATEMENTS):
+        for position in range(accounts_per_statement):
+            account_id = (number + 1) * 100000 + position + 1
+            exercise.add_account(account_id, f"{name} {position + 1}")
+            lst.append(account_id)
+
+    return lst
+
+
+def generate_policies(accounts: list[int], count: int, first_invoice: int = 1, seed: int = 0) -> Iterator[Policy]:
+    # The same seed always generates the same policies, so two runs post exactly the same journal
+    rng = random.Random(seed)
+    date = datetime(2000, 1, 1)
+
+    for number in range(count):
+        debit_account, credit_account = rng.sample(accounts, 2)
+        amount = Money.from_cents(rng.randint(1, 1000000))
+        date += timedelta(minutes=rng.randint(0, 60))
+
+        policy = Policy(first_invoice + number, f"Synthetic policy {first_invoice + number}.", date)
+        policy.debit = AccountMovement(debit_account, amount, "d")
+        policy.credit = AccountMovement(credit_account, amount, "c")
+
+        yield policy
+
+
+def generate_exercise(name: str, accounts_per_statement: int, policies: int, seed: int = 0) -> Exercise:
+    exercise = Exercise(company_name, name)
+    exercise.post_many(generate_policies(generate_accounts(exercise, accounts_per_statement), policies, seed=seed))
+
+    return exercise
+
+
+def measure(run: Callable[[], list[int]], repeat: int) -> dict:
+    # Every call of run times its own operations and returns their latencies in nanoseconds
+    latencies = []
+
+    for _ in range(repeat):
+        latencies.extend(run())
+
+    # Peak memory is taken from an extra call, tracing allocations would slow down the timed ones
+    tracemalloc.start()
+
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+
+    return {
+        "operations": len(latencies),
+        "throughput": len(latencies) / (total / 1e9) if total > 0 else None,
+        "mean_ms": total / len(latencies) / 1e6,
+        "p50_ms": percentile(latencies, 50) / 1e6,
+        "p90_ms": percentile(latencies, 90) / 1e6,
+        "p99_ms": percentile(latencies, 99) / 1e6,
+        "max_ms": latencies[-1] / 1e6,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def footprint(accounts_per_statement: int, policies: int, seed: int = 0) -> dict:
+    # Memory still held once the exercise is built, so what the generator allocated and dropped isn't counted
+    tracemalloc.start()
+
+    try:
+        exercise = generate_exercise("Footprint", accounts_per_statement, policies, seed)
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    movements = sum(len(policy.rows) for policy in exercise.policies)
+    data = pickle.dumps(exercise, pickle.HIGHEST_PROTOCOL)
+
+    return {
+        "movements": movements,
+        "memory_bytes_per_movement": memory / movements,
+        "pickle_bytes_per_movement": len(data) / movements,
+    }
+
+
+def percentile(latencies: list[int], rank: float) -> float:
+    position = (len(latencies) - 1) * rank / 100
+    low = math.floor(position)
+    high = math.ceil(position)
+
+    return latencies[low] + (latencies[high] - latencies[low]) * (position - low)
+
+
+def elapsed_ns(operation: Callable, *args) -> int:
+    start = time.perf_counter_ns()
+    operation(*args)
+
+    return time.perf_counter_ns() - start
+
+
+def save_exercises(backend: str, path: str, exercises: list[Exercise]) -> list[int]:
+    storage = open_storage(backend, path, snapshot_interval)
+
+    def save(exercise: Exercise) -> None:
+        storage.create_exercise(exercise)
+        storage.release(exercise)
+
+    try:
+        return [elapsed_ns(save, exercise) for exercise in exercises]
+    finally:
+        storage.close()
+
+
+def open_exercises(backend: str, path: str, names: list[str]) -> list[int]:
+    # Exercises are opened from a new storage, so nothing is served from what was saved before
+    storage = open_storage(backend, path, snapshot_interval)
+
+    def load(name: str) -> None:
+        exercise = storage.open_exercise(name)
+        exercise.statement_balances()
+        storage.release(exercise)
+
+    try:
+        return [elapsed_ns(load, name) for name in names]
+    finally:
+        storage.close()
+
+
+def run_benchmarks(accounts_per_statement: int, policies: int, exercises: int, repeat: int, seed: int = 0, backend: str = "journal") -> dict:
+    exercise = generate_exercise("Benchmark", accounts_per_statement, policies, seed)
+    accounts = [account for statement in exercise.statements for account in statement.accounts.values()]
+    data = pickle.dumps(exercise, pickle.HIGHEST_PROTOCOL)
+    lst = [generate_exercise(f"Benchmark {number + 1}", accounts_per_statement, policies, seed + number) for number in range(exercises)]
+
+    def post() -> list[int]:
+        target = Exercise(company_name, "Benchmark")
+        account_ids = generate_accounts(target, accounts_per_statement)
+
+        def post_one(policy: Policy) -> None:
+            target.policies = policy
+
+        return [elapsed_ns(post_one, policy) for policy in generate_policies(account_ids, policies, seed=seed)]
+
+    def close() -> list[int]:
+        # Closing changes the exercise, so every call closes its own copy
+        copy = pickle.loads(data)
+
+        return [elapsed_ns(copy.close_book)]
+
+    def balance_sheet() -> list[int]:
+        # Reports are cached until the exercise changes, so every call computes it from an empty cache
+        exercise.clear_cache()
+
+        return [elapsed_ns(exercise.balance_sheet)]
+
+    with tempfile.TemporaryDirectory() as path:
+        save_exercises(backend, os.path.join(path, "saved"), lst)
+
+        results = {
+            "post": measure(post, repeat),
+            "account_balance": measure(lambda: [elapsed_ns(account.balance) for account in accounts], repeat),
+            "statement_balance": measure(lambda: [elapsed_ns(statement.balance) for statement in exercise.statements], repeat),
+            "balance_sheet": measure(balance_sheet, repeat),
+            "close_book": measure(close, repeat),
+            "get_all_accounts": measure(lambda: [elapsed_ns(exercise.get_all_accounts)], repeat),
+            "pickle_save": measure(lambda: [elapsed_ns(pickle.dumps, exercise, pickle.HIGHEST_PROTOCOL)], repeat),
+            "pickle_load": measure(lambda: [elapsed_ns(pickle.loads, data)], repeat),
+            "storage_save": measure(lambda: save_exercises(backend, tempfile.mkdtemp(dir=path), lst), repeat),
+            "storage_open": measure(lambda: open_exercises(backend, os.path.join(path, "saved"), [item.name for item in lst]), repeat),
+        }
+
+    return {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "accounts_per_statement": accounts_per_statement,
+            "policies": policies,
+            "exercises": exercises,
+            "repeat": repeat,
+            "seed": seed,
+            "backend": backend,
+        },
+        "results": results,
+        "footprint": footprint(accounts_per_statement, policies, seed),
+    }
+
+
+def compare(results: dict, baseline: dict) -> Iterator[str]:
+    if results["parameters"] != baseline["parameters"]:
+        yield "The baseline was run with other parameters, the results may not be comparable"
+
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+
+        before = baseline["results"][name]["p50_ms"]
+        after = result["p50_ms"]
+        change = (after - before) / before * 100 if before > 0 else 0
+
+        yield f"  {name:<20} p50 {before:>12.4f} ms -> {after:>12.4f} ms  {'+' if change >= 0 else ''}{change:.1f}%"
+
+    # Results saved before the footprint was measured don't have it
+    for name in ("memory_bytes_per_movement", "pickle_bytes_per_movement") if "footprint" in baseline else ():
+        before = baseline["footprint"][name]
+        after = results["footprint"][name]
+        change = (after - before) / before * 100 if before > 0 else 0
+
+        yield f"  {name:<26} {before:>10.1f} B -> {after:>10.1f} B  {'+' if change >= 0 else ''}{change:.1f}%"
+
+
+def report_lines(results: dict) -> Iterator[str]:
+    yield f"  {'operation':<20} {'ops':>8} {'ops/s':>12} {'p50 ms':>12} {'p90 ms':>12} {'p99 ms':>12} {'peak KiB':>10}"
+
+    for name, result in results["results"].items():
+        throughput = f"{result['throughput']:>12.1f}" if result["throughput"] is not None else f"{'-':>12}"
+
+        yield f"  {name:<20} {result['operations']:>8} {throughput} {result['p50_ms']:>12.4f} {result['p90_ms']:>12.4f} {result['p99_ms']:>12.4f} {result['peak_memory_bytes'] / 1024:>10.1f}"
+
+    if "footprint" in results:
+        yield ""
+        yield f"  {results['footprint']['movements']} movements, {results['footprint']['memory_bytes_per_movement']:.1f} bytes each in memory, {results['footprint']['pickle_bytes_per_movement']:.1f} bytes each pickled"
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(prog="python -m Accounting.benchmark", description="Benchmark the ledger and its storage with synthetic exercises.")
+    parser.add_argument("--accounts", type=int, default=20, help="accounts per statement, 20 by default")
+    parser.add_argument("--policies", type=int, default=10000, help="policies per exercise, 10000 by default")
+    parser.add_argument("--exercises", type=int, default=3, help="exercises per database, 3 by default")
+    parser.add_argument("--repeat", type=int, default=5, help="times every operation is measured, 5 by default")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data, 0 by default")
+    parser.add_argument("--backend", choices=["journal", "sqlite"], default="journal", help="storage backend, journal by default")
+    parser.add_argument("--output", help="JSON file to save the results to")
+    parser.add_argument("--compare", help="JSON file with the results of a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.accounts < 1 or args.policies < 1 or args.exercises < 1 or args.repeat < 1:
+            raise Exception("ERROR: Accounts, policies, exercises and repeat must be positive.")
+
+        baseline = None
+
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        results = run_benchmarks(args.accounts, args.policies, args.exercises, args.repeat, args.seed, args.backend)
+
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    for line in report_lines(results):
+        print(line)
+
+    if baseline is not None:
+        print()
+
+        for line in compare(results, baseline):
+            print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,14 @@
 from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.money import Money
+from Accounting.classes.movement_store import MovementStore
+from Accounting.instrumentation import timed
+
+from array import array
+from collections.abc import Iterator
+from bisect import bisect_right
+from heapq import merge
+from itertools import accumulate
+from datetime import datetime
 
 
 class Account:
@@ -11,60 +21,123 @@ class Account:
             The unique identifier for the account instance.
         name : str
             The name of the account.
-        credits : list[AccountMovement]
-            All credit's AccountMovements associated with the account.
-        debits : list[AccountMovement]
-            All debit's AccountMovements associated with the account.
+        store : MovementStore
+            The store holding the account's movements, shared by all the accounts of an exercise.
+        credits : array[int]
+            The store indexes of all credit's AccountMovements associated with the account.
+        debits : array[int]
+            The store indexes of all debit's AccountMovements associated with the account.
+        credit balance : int
+            Running total in cents of all the credits, updated every time a credit is recorded.
+        debit balance : int
+            Running total in cents of all the debits, updated every time a debit is recorded.
+        ledger dates : list[datetime]
+            The posting date of every movement, in the order they were recorded.
+        ordered : bool
+            True while every movement was recorded in date order, so the ledger dates are already sorted.
+        sums : array[int]
+            Cumulative debits minus credits in cents of the movements in date order, extended as movements are
+            recorded in date order, otherwise rebuilt when they're read. It isn't pickled.
+        sorted dates : list[datetime]
+            The ledger dates sorted, only built when a movement was recorded out of date order. It isn't pickled.
 
         Methods:
         --------
-        __init__(account_id: int, name: str):
-            Initializes a new Account instance with the given parameters.
+        __init__(account_id: int, name: str, nature: str, store: MovementStore = None):
+            Initializes a new Account instance with the given parameters, with its own store if none is given.
         __str__() -> str:
             Returns a string representation of the account instance.
+        iter_report_lines() -> Iterator[str]:
+            Yields the lines of the string representation of the account instance, one at a time.
         account_id() -> int:
             Returns the account id attribute.
         name() -> str:
             Returns the name attribute.
-        credits() -> AccountMovement:
-            Returns the credits attribute
+        credits() -> list[AccountMovement]:
+            Returns the account's credits read from the store.
         credits(credit: AccountMovement) -> None:
-            Sets the credit attribute if none have been set.
-            Raises exception if credit balance and debit balance don't match or credit and debit accounts are the same.
-        debits() -> AccountMovement:
-            Returns the debits attribute.
+            Records the credit.
+            Raises exception if the AccountMovement isn't a credit or its account id doesn't match the account's.
+        debits() -> list[AccountMovement]:
+            Returns the account's debits read from the store.
         debits(debit: AccountMovement) -> None:
-            Sets the debit attribute if none have been set.
-            Raises exception if credit balance and debit balance don't match or credit and debit accounts are the same.
+            Records the debit.
+            Raises exception if the AccountMovement isn't a debit or its account id doesn't match the account's.
+        credit_count() -> int:
+            Returns the number of credits.
+        debit_count() -> int:
+            Returns the number of debits.
+        credit_at(position: int) -> AccountMovement:
+            Returns the credit at the given position, read from the store.
+        debit_at(position: int) -> AccountMovement:
+            Returns the debit at the given position, read from the store.
+        credit_balance() -> int:
+            Returns the credit balance attribute.
+        debit_balance() -> int:
+            Returns the debit balance attribute.
+        ledger() -> Iterator[tuple[int, int]]:
+            Yields the store index and the debit minus credit in cents of every movement, in the order they were recorded.
+        record(account_movement: AccountMovement, policy: int = -1, date: datetime = None) -> None:
+            Stores the account movement posted on the given date and adds it to the credits or debits according to its d_c.
+            Movements without a date are counted in every balance.
+            Raises exception if the AccountMovement's account id doesn't match the account's.
+            Raises exception if the AccountMovement's d_c isn't a valid option.
+        balance(as_of: datetime = None) -> AccountMovement:
+            Returns the account's balance from the running credit and debit totals, or from the ledger sums
+            of the movements posted up to the given date (inclusive).
     """
 
-    def __init__(self, account_id: int, name: str, nature: str):
+    def __init__(self, account_id: int, name: str, nature: str, store: MovementStore = None):
         self._account_id = account_id
         self._name = name
         self._nature = nature.upper()
-        self._credits: list[AccountMovement] = []
-        self._debits: list[AccountMovement] = []
+        self._store = MovementStore() if store is None else store
+        self._credits = array("q")
+        self._debits = array("q")
+        self._credit_balance = 0
+        self._debit_balance = 0
+        self._ledger_dates: list[datetime] = []
+        self._ordered = True
+        self._sums = array("q")
+        self._sorted_dates: list[datetime] = None
+
+    def __getstate__(self) -> dict:
+        # The sums are rebuilt from the store, so the movements are only pickled once
+        state = self.__dict__.copy()
+        state.pop("_sums", None)
+        state.pop("_sorted_dates", None)
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._sums = None
+        self._sorted_dates = None
 
     def __str__(self) -> str:
+        return "\n".join(self.iter_report_lines())
+
+    def iter_report_lines(self) -> Iterator[str]:
         bal = self.balance()
 
-        res = "=" * 27 + "ACCOUNT" + "=" * 27 + "\n"
-        res += f"  Name: {self._name}\n"
-        res += f"  ID: {self._account_id}\n"
-        res += f"  Balance: {'-' if bal.d_c != self._nature else ''}${bal.quantity}\n"
-        res += f"  Credits:\n" if len(self._credits) > 0 else ""
+        yield "=" * 27 + "ACCOUNT" + "=" * 27
+        yield f"  Name: {self._name}"
+        yield f"  ID: {self._account_id}"
+        yield f"  Balance: {'-' if bal.d_c != self._nature else ''}${bal.quantity}"
 
-        for credit in self._credits:
-            res += f"    {credit}\n"
+        if len(self._credits) > 0:
+            yield f"  Credits:"
 
-        res += f"  Debits:\n" if len(self._debits) > 0 else ""
+        for index in self._credits:
+            yield f"    {self._store.movement(index)}"
 
-        for debit in self._debits:
-            res += f"    {debit}\n"
+        if len(self._debits) > 0:
+            yield f"  Debits:"
 
-        res += "=" * 62
+        for index in self._debits:
+            yield f"    {self._store.movement(index)}"
 
-        return res
+        yield "=" * 62
 
     @property
     def account_id(self) -> int:
@@ -83,40 +156,125 @@ class Account:
         pass
 
     @property
-    def credits(self) -> [AccountMovement]:
-        return self._credits.copy()
+    def credits(self) -> list[AccountMovement]:
+        return [self._store.movement(index) for index in self._credits]
 
     @credits.setter
     def credits(self, account_movement: AccountMovement) -> None:
-        if account_movement.account_id == self._account_id:
-            self._credits.append(account_movement)
-        else:
-            raise Exception("ERROR: AccountMovement's account id doesn't match self account id.")
+        if account_movement.d_c != "C":
+            raise Exception("ERROR: AccountMovement isn't a credit.")
+
+        self.record(account_movement)
 
     @property
-    def debits(self) -> [AccountMovement]:
-        return self._debits.copy()
+    def debits(self) -> list[AccountMovement]:
+        return [self._store.movement(index) for index in self._debits]
 
     @debits.setter
     def debits(self, account_movement: AccountMovement) -> None:
-        if account_movement.account_id == self._account_id:
-            self._debits.append(account_movement)
-        else:
+        if account_movement.d_c != "D":
+            raise Exception("ERROR: AccountMovement isn't a debit.")
+
+        self.record(account_movement)
+
+    @property
+    def credit_count(self) -> int:
+        return len(self._credits)
+
+    @credit_count.setter
+    def credit_count(self, credit_count: int) -> None:
+        pass
+
+    @property
+    def debit_count(self) -> int:
+        return len(self._debits)
+
+    @debit_count.setter
+    def debit_count(self, debit_count: int) -> None:
+        pass
+
+    def credit_at(self, position: int) -> AccountMovement:
+        return self._store.movement(self._credits[position])
+
+    def debit_at(self, position: int) -> AccountMovement:
+        return self._store.movement(self._debits[position])
+
+    @property
+    def credit_balance(self) -> int:
+        return self._credit_balance
+
+    @credit_balance.setter
+    def credit_balance(self, credit_balance: int) -> None:
+        pass
+
+    @property
+    def debit_balance(self) -> int:
+        return self._debit_balance
+
+    @debit_balance.setter
+    def debit_balance(self, debit_balance: int) -> None:
+        pass
+
+    def ledger(self) -> Iterator[tuple[int, int]]:
+        # Credits and debits are both in the order they were recorded, so merging them follows the ledger dates
+        for index in merge(self._credits, self._debits):
+            yield index, self._store.signed_cents(index)
+
+    def record(self, account_movement: AccountMovement, policy: int = -1, date: datetime = None) -> None:
+        if account_movement.account_id != self._account_id:
             raise Exception("ERROR: AccountMovement's account id doesn't match self account id.")
 
-    def balance(self) -> AccountMovement:
-        credit_balance = 0
-        debit_balance = 0
+        index = self._store.append(account_movement, policy)
+        cents = account_movement.quantity.cents
+
+        if account_movement.d_c == "C":
+            self._credits.append(index)
+            self._credit_balance += cents
+            cents = -cents
+        else:
+            self._debits.append(index)
+            self._debit_balance += cents
+
+        date = datetime.min if date is None else date
+
+        if self._ordered and len(self._ledger_dates) > 0 and date < self._ledger_dates[-1]:
+            self._ordered = False
+
+        self._ledger_dates.append(date)
+
+        # Movements recorded in date order extend the sums, any other leaves them to be rebuilt when they're read
+        if self._ordered and self._sums is not None:
+            self._sums.append((self._sums[-1] if len(self._sums) > 0 else 0) + cents)
+        else:
+            self._sums = None
+            self._sorted_dates = None
 
-        for credit in self._credits:
-            credit_balance += credit.quantity
+    @timed("account.balance")
+    def balance(self, as_of: datetime = None) -> AccountMovement:
+        if as_of is None:
+            credit_balance = self._credit_balance
+            debit_balance = self._debit_balance
+        else:
+            if self._sums is None:
+                self._build_sums()
 
-        for debit in self._debits:
-            debit_balance += debit.quantity
+            position = bisect_right(self._ledger_dates if self._ordered else self._sorted_dates, as_of)
+            credit_balance = 0
+            debit_balance = self._sums[position - 1] if position > 0 else 0
 
         if credit_balance > debit_balance:
-            return AccountMovement(000000, credit_balance - debit_balance, "C")
+            return AccountMovement(000000, Money.from_cents(credit_balance - debit_balance), "C")
         elif debit_balance > credit_balance:
-            return AccountMovement(000000, debit_balance - credit_balance, "D")
+            return AccountMovement(000000, Money.from_cents(debit_balance - credit_balance), "D")
+        else:
+            return AccountMovement(000000, Money.from_cents(0), self._nature)
+
+    def _build_sums(self) -> None:
+        amounts = [cents for index, cents in self.ledger()]
+
+        if self._ordered:
+            self._sums = array("q", accumulate(amounts))
         else:
-            return AccountMovement(000000, debit_balance - credit_balance, self._nature)
+            order = sorted(range(len(self._ledger_dates)), key=self._ledger_dates.__getitem__)
+            self._sorted_dates = [self._ledger_dates[index] for index in order]
+            self._sums = array("q", accumulate(amounts[index] for index in order))
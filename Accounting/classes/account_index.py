@@ -0,0 +1,66 @@
+from bisect import bisect_left
+from collections.abc import Iterable
+
+
+class AccountIndex:
+
+    """
+        Sorted index of the accounts of an exercise, to search them by the first digits of their id or the first
+        letters of their name.
+
+        The index is built once and only read afterwards, every search is a binary search followed by at most
+        limit accounts, whatever the number of accounts.
+
+        Attributes:
+        -----------
+        ids : list[str]
+            The account ids as text, sorted.
+        by id : list[tuple[int, str]]
+            The id and name of every account, in the order of ids.
+        names : list[str]
+            The account names, case folded and sorted.
+        by name : list[tuple[int, str]]
+            The id and name of every account, in the order of names.
+
+        Methods:
+        --------
+        __init__(accounts: Iterable[tuple[int, str]]):
+            Initializes a new AccountIndex instance with the given account ids and names.
+        __len__() -> int:
+            Returns the number of accounts in the index.
+        search(prefix: str, limit: int) -> list[tuple[int, str]]:
+            Returns the id and name of up to limit accounts whose id starts with the prefix, if it starts with a
+            digit, or whose name starts with it otherwise, ignoring case. An empty prefix returns the lowest ids.
+    """
+
+    def __init__(self, accounts: Iterable[tuple[int, str]]):
+        accounts = list(accounts)
+
+        by_id = sorted((str(account_id), account_id, name) for account_id, name in accounts)
+        self._ids = [key for key, account_id, name in by_id]
+        self._by_id = [(account_id, name) for key, account_id, name in by_id]
+
+        by_name = sorted((name.casefold(), account_id, name) for account_id, name in accounts)
+        self._names = [key for key, account_id, name in by_name]
+        self._by_name = [(account_id, name) for key, account_id, name in by_name]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        prefix = prefix.strip()
+
+        # An entry filled from the combo box reads "<id> <name>", only its id is searched
+        if prefix == "" or prefix[0].isdigit():
+            keys, accounts, key = self._ids, self._by_id, prefix.split(" ")[0]
+        else:
+            keys, accounts, key = self._names, self._by_name, prefix.casefold()
+
+        res = []
+        position = bisect_left(keys, key)
+
+        while position < len(keys) and len(res) < limit and keys[position].startswith(key):
+            res.append(accounts[position])
+            position += 1
+
+        return res
@@ -1,3 +1,6 @@
+from Accounting.classes.money import Money
+
+
 class AccountMovement:
 
     """
@@ -7,31 +10,47 @@ class AccountMovement:
         -----------
         account_id : int
             The unique identifier of the account the movement is associated with.
-        quantity : float
-            The amount of money involved in the movement, expressed in dollars.
+        quantity : Money
+            The exact amount of money involved in the movement.
         d_c : str
             A string representing the type of movement. Must be either 'D' (for debit) or 'C' (for credit).
 
         Methods:
         --------
-        __init__(account_id: int, quantity: float, d_c: str):
-            Initializes a new AccountMovement instance with the given parameters.
+        __init__(account_id: int, quantity: Money | float | str, d_c: str):
+            Initializes a new AccountMovement instance with the given parameters, quantity is converted to Money.
         __str__() -> str:
             Returns a string representation of the AccountMovement instance.
         account_id() -> int:
             Returns the account_id attribute.
-        quantity() -> float:
+        quantity() -> Money:
             Returns the quantity attribute.
         d_c() -> str:
             Returns the d_c attribute.
 
     """
 
-    def __init__(self, account_id: int, quantity: float, d_c: str):
+    __slots__ = ("_account_id", "_quantity", "_d_c")
+
+    def __init__(self, account_id: int, quantity: Money | float | str, d_c: str):
         self._account_id = account_id
-        self._quantity = quantity
+        self._quantity = Money(quantity)
         self._d_c = d_c.upper()
 
+    def __reduce__(self):
+        return AccountMovement, (self._account_id, self._quantity, self._d_c)
+
+    def __setstate__(self, state) -> None:
+        # Only movements pickled by older versions have a state, as a dict or a (None, state) tuple
+        if isinstance(state, tuple):
+            state = state[1]
+
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
+
+        # Movements pickled before Money existed have float quantities
+        self._quantity = Money(self._quantity)
+
     def __str__(self) -> str:
         return f"Account: {self._account_id}, Quantity: ${self.quantity}, Type: {'Debit' if self._d_c == 'D' else 'Credit'}"
 
@@ -44,11 +63,11 @@ class AccountMovement:
         pass
 
     @property
-    def quantity(self) -> float:
+    def quantity(self) -> Money:
         return self._quantity
 
     @quantity.setter
-    def quantity(self, quantity: float) -> None:
+    def quantity(self, quantity: Money) -> None:
         pass
 
     @property
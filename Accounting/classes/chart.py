@@ -0,0 +1,141 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.money import Money
+
+from bisect import insort
+from collections.abc import Iterator
+
+
+# number of leading digits of an account id that identify each level: statement, group, subgroup and account
+LEVELS = (1, 2, 3, 6)
+
+# divisor that turns an account id into the id of the node above it at every level
+DIVISORS = tuple(10 ** (LEVELS[-1] - digits) for digits in LEVELS)
+
+
+class ChartOfAccounts:
+
+    """
+        Hierarchical chart of accounts, grouped by the leading digits of the account ids.
+
+        Every account belongs to a subgroup (its first three digits), every subgroup to a group (its first two
+        digits) and every group to a statement (its first digit), so account 101200 is in subgroup 101, group 10
+        and statement 1. Each node keeps the running balance of all the accounts below it, updated as movements are
+        recorded, so subtotals are read without going over the movements.
+
+        Attributes:
+        -----------
+        natures : dict[int, str]
+            The nature of every statement, with the statement's number as key.
+        names : dict[int, str]
+            The name of every node, with the node's id as key, empty for groups without a name.
+        balances : dict[int, int]
+            The debits minus the credits in cents of every node, with the node's id as key.
+        children : dict[int, list[int]]
+            The ids of the nodes directly below every node, sorted, with the node's id as key and 0 as the root.
+
+        Methods:
+        --------
+        __init__(statements: list[tuple[str, str]]):
+            Initializes a new ChartOfAccounts instance with a node for every statement, from their names and natures.
+        level(node_id: int) -> int:
+            Returns the level of the node, 1 for statements up to 4 for accounts.
+            Raises exception if the node id doesn't have a valid number of digits.
+        groups() -> dict[int, str]:
+            Returns the name of every named group and subgroup, with the group's id as key.
+        add_group(group_id: int, name: str) -> None:
+            Names the group or subgroup with the given id, creating it if it doesn't exist.
+            Raises exception if the group id doesn't have two or three digits or doesn't belong to any statement.
+        add_account(account_id: int, name: str) -> None:
+            Adds the account, and the groups above it that don't exist yet.
+        record(account_id: int, cents: int) -> None:
+            Adds the given debits minus credits in cents to the balance of the account and all the nodes above it.
+        balance(node_id: int) -> AccountMovement:
+            Returns the balance of the node, in the direction of its balance.
+            Raises exception if the node doesn't exist.
+        rollup(depth: int = 4) -> Iterator[tuple[int, str, int, AccountMovement]]:
+            Yields the id, name, level and balance of every node down to the given level, each node before the
+            nodes below it, in order of id.
+    """
+
+    def __init__(self, statements: list[tuple[str, str]]):
+        self._natures: dict[int, str] = {}
+        self._names: dict[int, str] = {}
+        self._balances: dict[int, int] = {}
+        self._children: dict[int, list[int]] = {0: []}
+
+        for number, (name, nature) in enumerate(statements):
+            self._natures[number + 1] = nature.upper()
+            self._add_node(number + 1, name, 0)
+
+    def level(self, node_id: int) -> int:
+        digits = len(str(node_id))
+
+        if digits not in LEVELS:
+            raise Exception("ERROR: ID '" + str(node_id) + "' isn't a statement, group or account ID.")
+
+        return LEVELS.index(digits) + 1
+
+    def groups(self) -> dict[int, str]:
+        return {node_id: name for node_id, name in self._names.items() if 1 < self.level(node_id) < len(LEVELS) and name != ""}
+
+    def add_group(self, group_id: int, name: str) -> None:
+        if len(str(group_id)) not in LEVELS[1:-1] or group_id // 10 ** (len(str(group_id)) - 1) not in self._natures:
+            raise Exception("ERROR: Group ID '" + str(group_id) + "' doesn't belong to any statement.")
+
+        self._add_path(group_id)
+        self._names[group_id] = name
+
+    def add_account(self, account_id: int, name: str) -> None:
+        self._add_path(account_id)
+        self._names[account_id] = name
+
+    def record(self, account_id: int, cents: int) -> None:
+        balances = self._balances
+
+        for divisor in DIVISORS:
+            balances[account_id // divisor] += cents
+
+    def balance(self, node_id: int) -> AccountMovement:
+        if node_id not in self._balances:
+            raise Exception("ERROR: Node '" + str(node_id) + "' doesn't exist in the chart of accounts.")
+
+        debit_balance = self._balances[node_id]
+
+        if debit_balance < 0:
+            return AccountMovement(node_id, Money.from_cents(-debit_balance), "C")
+        elif debit_balance > 0:
+            return AccountMovement(node_id, Money.from_cents(debit_balance), "D")
+        else:
+            return AccountMovement(node_id, Money.from_cents(0), self._natures[node_id // 10 ** (len(str(node_id)) - 1)])
+
+    def rollup(self, depth: int = 4) -> Iterator[tuple[int, str, int, AccountMovement]]:
+        # Depth first, the nodes below the given level are never visited
+        stack = [(node_id, 1) for node_id in reversed(self._children[0])]
+
+        while stack:
+            node_id, level = stack.pop()
+
+            yield node_id, self._names[node_id], level, self.balance(node_id)
+
+            if level < depth:
+                stack.extend((child_id, level + 1) for child_id in reversed(self._children.get(node_id, ())))
+
+    def _add_path(self, node_id: int) -> None:
+        # Groups are created on demand, without a name, when the first account below them is added
+        parent_id = 0
+
+        for digits in LEVELS:
+            if digits > len(str(node_id)):
+                break
+
+            prefix = node_id // 10 ** (len(str(node_id)) - digits)
+
+            if prefix not in self._balances:
+                self._add_node(prefix, "", parent_id)
+
+            parent_id = prefix
+
+    def _add_node(self, node_id: int, name: str, parent_id: int) -> None:
+        self._names[node_id] = name
+        self._balances[node_id] = 0
+        insort(self._children.setdefault(parent_id, []), node_id)
@@ -0,0 +1,121 @@
+from Accounting.classes.money import Money
+from Accounting.classes.policy import Policy
+
+
+class ClosingSummary:
+
+    """
+        Result of closing the book of an exercise, enough to show it without reading the exercise again.
+
+        Attributes:
+        -----------
+        revenue : Money
+            The total balance of the revenue accounts that were closed.
+        expenses : Money
+            The total balance of the expenses accounts that were closed.
+        income tax : Money
+            The income tax payable of the exercise, zero if there was no operating income.
+        policy : Policy
+            The compound policy with all the closing entries, None if every account was already closed.
+        closed accounts : int
+            The number of revenue and expenses accounts with a balance that were closed.
+
+        Methods:
+        --------
+        __init__(revenue: Money, expenses: Money, income_tax: Money, policy: Policy, closed_accounts: int):
+            Initializes a new ClosingSummary instance with the given parameters.
+        __str__() -> str:
+            Returns a string representation of the closing summary instance.
+        revenue() -> Money:
+            Returns the revenue attribute.
+        expenses() -> Money:
+            Returns the expenses attribute.
+        operating_income() -> Money:
+            Returns the revenue minus the expenses.
+        income_tax() -> Money:
+            Returns the income tax attribute.
+        net_income() -> Money:
+            Returns the operating income minus the income tax, negative if it is a net loss.
+        policy() -> Policy:
+            Returns the policy attribute.
+        closed_accounts() -> int:
+            Returns the closed accounts attribute.
+    """
+
+    def __init__(self, revenue: Money, expenses: Money, income_tax: Money, policy: Policy, closed_accounts: int):
+        self._revenue = revenue
+        self._expenses = expenses
+        self._income_tax = income_tax
+        self._policy = policy
+        self._closed_accounts = closed_accounts
+
+    def __str__(self) -> str:
+        operating_income = self.operating_income
+        net_income = self.net_income
+
+        res = "=" * 26 + "CLOSING" + "=" * 26 + "\n"
+        res += f"  Revenue: {'-' if self._revenue < 0 else ''}${abs(self._revenue)}\n"
+        res += f"  Expenses: {'-' if self._expenses < 0 else ''}${abs(self._expenses)}\n"
+        res += f"  Operating Income: {'-' if operating_income < 0 else ''}${abs(operating_income)}\n"
+        res += f"  Income Tax Payable: ${self._income_tax}\n"
+        res += f"  {'Net Income' if net_income >= 0 else 'Net Loss'}: ${abs(net_income)}\n"
+        res += f"  Closed Accounts: {self._closed_accounts}\n"
+        res += "=" * 59
+
+        return res
+
+    @property
+    def revenue(self) -> Money:
+        return self._revenue
+
+    @revenue.setter
+    def revenue(self, revenue: Money) -> None:
+        pass
+
+    @property
+    def expenses(self) -> Money:
+        return self._expenses
+
+    @expenses.setter
+    def expenses(self, expenses: Money) -> None:
+        pass
+
+    @property
+    def operating_income(self) -> Money:
+        return self._revenue - self._expenses
+
+    @operating_income.setter
+    def operating_income(self, operating_income: Money) -> None:
+        pass
+
+    @property
+    def income_tax(self) -> Money:
+        return self._income_tax
+
+    @income_tax.setter
+    def income_tax(self, income_tax: Money) -> None:
+        pass
+
+    @property
+    def net_income(self) -> Money:
+        return self._revenue - self._expenses - self._income_tax
+
+    @net_income.setter
+    def net_income(self, net_income: Money) -> None:
+        pass
+
+    @property
+    def policy(self) -> Policy:
+        return self._policy
+
+    @policy.setter
+    def policy(self, policy: Policy) -> None:
+        pass
+
+    @property
+    def closed_accounts(self) -> int:
+        return self._closed_accounts
+
+    @closed_accounts.setter
+    def closed_accounts(self, closed_accounts: int) -> None:
+        pass
@@ -1,11 +1,33 @@
 from Accounting.classes.policy import Policy
 from Accounting.classes.statement import Statement
+from Accounting.classes.account_index import AccountIndex
 from Accounting.classes.account_movement import AccountMovement
-
+from Accounting.classes.chart import ChartOfAccounts
+from Accounting.classes.closing_summary import ClosingSummary
+from Accounting.classes.exercise_report import ExerciseReport
+from Accounting.classes.movement_store import MovementStore
+from Accounting.classes.report_cache import ReportCache, cached
+from Accounting.classes.money import Money
+from Accounting.classes.views import SequenceView, StatementView
+from Accounting.instrumentation import count, timed
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from copy import deepcopy
 
 
+# version of the pickled layout, exercises pickled with another version are rebuilt when loaded
+FORMAT = 8
+
+# name and nature of the statements of every exercise, the first digit of an account id is its statement's position
+STATEMENTS = [("Assets", "d"), ("Liabilities", "c"), ("Common Stock", "c"), ("Revenue", "c"), ("Expenses", "d")]
+
+# rendered reports and balances kept by every exercise, the least recently used are dropped first
+REPORT_CACHE_SIZE = 32
+
+
 class Exercise:
     """
         Represents an accounting exercise with statements.
@@ -20,8 +42,31 @@ class Exercise:
             The date and time the exercise was created.
         statements : [Statement]
             All the statements involved in the exercise (Assets, Liabilities, Common Stock, Revenue and Expenses).
+        movements : MovementStore
+            The columnar store with all the account movements of the exercise, shared by all its accounts.
+        chart : ChartOfAccounts
+            The accounts grouped by the leading digits of their ids, with the running balance of every group.
         policies : [Policy]
-            All the policies involved in the exercise.
+            All the policies involved in the exercise, their movements are read from the movements store. They
+            are pickled as columns, without their movements, which are pickled with the store.
+        invoices : dict[int, int]
+            Index of every policy in policies, with the policy's invoice as key, rebuilt when loaded.
+        dates : list[datetime]
+            The dates of all the policies, sorted, rebuilt only when a policy is posted out of date order and
+            when the exercise is loaded.
+        date order : array[int]
+            Index in policies of the policy with the date in the same position in dates.
+        dirty : bool
+            True if an account or a policy was added since the exercise was last saved or written to its journal,
+            it isn't pickled.
+        version : int
+            Number of changes since the exercise was created or loaded, bumped by every account, group and policy
+            added, it isn't pickled.
+        cache : ReportCache
+            The reports and balances already computed, keyed by kind, version and parameters, it isn't pickled.
+        account index : AccountIndex
+            The accounts sorted by id and by name, built on the first search and dropped when an account is added,
+            it isn't pickled.
 
         Methods:
         --------
@@ -29,63 +74,196 @@ class Exercise:
             Initializes a new Exercise instance with the given parameters.
         __str__() -> str:
             Returns a string representation of the exercise instance.
+        iter_report_lines() -> Iterator[str]:
+            Yields the lines of the string representation of the exercise instance, one at a time, so the whole
+            journal can be printed without building it in memory.
         company_name() -> str:
             Returns the company name attribute.
         name() -> str:
             Returns the name attribute.
         exercise() -> datetime:
             Returns the exercise attribute.
+        dirty() -> bool:
+            Returns the dirty attribute.
+        mark_saved() -> None:
+            Clears the dirty attribute, once the exercise has been saved.
+        version() -> int:
+            Returns the version attribute.
         nature() -> str:
             Returns the nature attribute.
-        statements() -> [Statement]:
-            Returns the statements attribute
-        policies() -> [Policy]:
-            Returns the policies attribute
+        statements() -> SequenceView:
+            Returns a read-only view of the statements attribute, nothing is copied.
+        policies() -> SequenceView:
+            Returns a read-only view of the policies attribute, nothing is copied.
         policies(policy: Policy) -> None:
             Record the policy and all the account movements in their corresponding accounts.
+            Raises exception if the policy doesn't have debits and credits with matching totals.
             Raises exception if an account id doesn't belong to any statement.
             Raises exception if the AccountMovement's account id doesn't exist.
             Raises exception if the AccountMovement's d_c isn't a valid option.
+            Raises exception if the policy's invoice already exists.
+        policy(invoice: int) -> Policy:
+            Returns the policy with the given invoice.
+            Raises exception if the invoice doesn't exist.
+        policies_between(start: datetime, end: datetime) -> list[Policy]:
+            Returns the policies dated from start (inclusive) to end (exclusive), sorted by date.
+        postings_for(account_id: int) -> list[Policy]:
+            Returns the policies with a movement in the given account, in posting order.
+            Raises exception if the account doesn't exist.
+        post_many(policies: Iterable[Policy]) -> list[Policy]:
+            Validates all the policies and then records them in one pass, without checking the accounting equation.
+            Raises exception, before recording any policy, if any of them isn't valid.
         add_account(account_id: int, name: str) -> None:
             Adds account to the corresponding statement.
             Raises exception if account id doesn't belong to any statement.
+        add_group(group_id: int, name: str) -> None:
+            Names the group (two digits) or subgroup (three digits) of accounts with the given id.
+            Raises exception if the group id doesn't belong to any statement.
+        groups() -> dict[int, str]:
+            Returns the name of every named group and subgroup, with the group's id as key.
+        rollup(depth: int = 4) -> list[tuple[int, str, int, AccountMovement]]:
+            Returns the id, name, level and balance of every statement (level 1), group (2), subgroup (3) and
+            account (4) down to the given level, read from running subtotals without going over the movements.
+            Raises exception if depth is less than 1.
         next_policy_invoice() -> int:
             Returns the next policy invoice.
+        search_accounts(prefix: str, limit: int = 20) -> list[tuple[int, str]]:
+            Returns the id and name of up to limit accounts whose id, or name if the prefix doesn't start with a
+            digit, starts with the prefix, from a sorted index built once until an account is added.
         get_all_accounts() -> list[str]:
             Returns all account's id in the exercise.
+        account_balances() -> dict[int, AccountMovement]:
+            Returns the balance of every account of the exercise, computed in a single pass over all the movements.
+        trial_balance() -> Iterator[tuple[int, str, Money, Money, Money]]:
+            Yields the id, name, total debits, total credits and balance (according to the nature of its
+            statement) of every account, read from the running totals.
+        general_ledger() -> Iterator[tuple[int, str, datetime, int, str, Money, Money, Money]]:
+            Yields the account id, account name, date, invoice, description, debit, credit and running balance of
+            every movement posted in a policy, grouped by account and in posting order, one movement at a time.
+        statement_balances(as_of: datetime = None) -> list[Money]:
+            Returns the balance of every statement, up to the given date (inclusive) if any.
+        check_accounting_equation() -> bool:
+            Returns True if the assets equal the liabilities, common stock and revenue minus the expenses.
+        balance_sheet(as_of: datetime = None) -> str:
+            Returns the balance sheet of the exercise, with the balances up to the given date (inclusive) if any.
+        detailed_balance_sheet(depth: int = 3) -> str:
+            Returns the balances of the exercise grouped by statement, group, subgroup and account, down to the given level.
+        report(as_of: datetime = None) -> ExerciseReport:
+            Returns the statement balances, balance sheet, income statement and accounting equation check of the
+            exercise, the balances up to the given date (inclusive) if any.
+            The accounting equation check and all the reports are cached until the exercise changes.
+        clear_cache() -> None:
+            Drops every cached report, so the next ones are computed again.
+        closing_summary() -> ClosingSummary:
+            Returns the balances that closing the book would close and the compound policy that would close them,
+            without posting it, reading every revenue and expenses balance in a single pass.
+        close_book() -> ClosingSummary:
+            Closes every revenue and expenses account with a balance into retained earnings and the income tax
+            payable, with a single compound policy, and returns what was closed.
+        rollover(name: str) -> Exercise:
+            Returns a new exercise with the given name, the same groups and accounts, and a single compound policy
+            opening every assets, liabilities and common stock account with its closing balance, without any of
+            the movements of this exercise.
+            Raises exception if the book hasn't been closed.
     """
 
     def __init__(self, company_name: str, name: str):
         self._company_name = company_name
         self._name = name
         self._exercise = datetime.now()
-        self._statements = []
+        self._format = FORMAT
+        self._movements = MovementStore()
+        self._statements = [Statement(name, nature, self._movements) for name, nature in STATEMENTS]
+        self._chart = ChartOfAccounts(STATEMENTS)
         self._policies = []
-
-        self._statements.append(Statement("Assets", "d"))
-        self._statements.append((Statement("Liabilities", "c")))
-        self._statements.append(Statement("Common Stock", "c"))
-        self._statements.append(Statement("Revenue", "c"))
-        self._statements.append(Statement("Expenses", "d"))
+        self._invoices: dict[int, int] = {}
+        self._dates: list[datetime] = []
+        self._date_order = array("q")
+        self._dirty = False
+        self._version = 0
+        self._cache = ReportCache(REPORT_CACHE_SIZE)
+        self._account_index: AccountIndex = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_dirty", None)
+        state.pop("_version", None)
+        state.pop("_cache", None)
+        state.pop("_account_index", None)
+        state.pop("_invoices", None)
+        state.pop("_dates", None)
+        state.pop("_date_order", None)
+
+        # The movements of the policies are already in the store, so only their headers and first rows are written
+        state["_policies"] = (
+            array("q", (policy.invoice for policy in self._policies)),
+            [policy.description for policy in self._policies],
+            [policy.date for policy in self._policies],
+            array("q", (policy.rows.start for policy in self._policies)),
+        )
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        if state.get("_format") == FORMAT:
+            self.__dict__.update(state)
+            self._policies = []
+
+            # Policies are posted one after the other, so every policy's rows end where the next policy's begin
+            invoices, descriptions, dates, starts = state["_policies"]
+            stops = [*starts[1:], len(self._movements)]
+
+            for invoice, description, date, start, stop in zip(invoices, descriptions, dates, starts, stops):
+                policy = Policy(invoice, description, date)
+                policy.bind(self._movements, start, stop)
+                self._policies.append(policy)
+
+            self._invoices = {policy.invoice: index for index, policy in enumerate(self._policies)}
+            self._dates = []
+            self._date_order = array("q")
+            self._dirty = False
+            self._version = 0
+            self._cache = ReportCache(REPORT_CACHE_SIZE)
+            self._account_index = None
+            return
+
+        # Exercises pickled by older versions are rebuilt by replaying their accounts and policies
+        self.__init__(state["_company_name"], state["_name"])
+        self._exercise = state["_exercise"]
+
+        for group_id, name in state["_chart"].groups().items() if "_chart" in state else ():
+            self.add_group(group_id, name)
+
+        for statement in state["_statements"]:
+            for account in statement.accounts.values():
+                self.add_account(account.account_id, account.name)
+
+        for policy in state["_policies"]:
+            self.policies = policy
 
     def __str__(self) -> str:
-        res = "=" * 29 + "EXERCISE" + "=" * 29 + "\n"
-        res += f"  Company Name: {self._company_name}\n"
-        res += f"  Name: {self._name}\n"
-        res += f"  Exercise: {self._exercise.strftime('%Y')}\n"
-        res += "  Statements:\n"
+        return "\n".join(self.iter_report_lines())
 
-        for statement in self._statements:
-            res += f"\n{statement}\n"
+    def iter_report_lines(self) -> Iterator[str]:
+        yield "=" * 29 + "EXERCISE" + "=" * 29
+        yield f"  Company Name: {self._company_name}"
+        yield f"  Name: {self._name}"
+        yield f"  Exercise: {self._exercise.strftime('%Y')}"
+        yield "  Statements:"
 
-        res += "  \nPolicies:\n" if len(self._policies) > 0 else ""
+        for statement in self._report_statements():
+            yield ""
+            yield from statement.iter_report_lines()
 
-        for policy in self._policies:
-            res += f"\n{policy}\n"
+        for number, policy in enumerate(self._report_policies()):
+            if number == 0:
+                yield "  "
+                yield "Policies:"
 
-        res += "=" * 66
+            yield ""
+            yield from policy.iter_report_lines()
 
-        return res
+        yield "=" * 66
 
     @property
     def company_name(self) -> str:
@@ -112,31 +290,95 @@ class Exercise:
         pass
 
     @property
-    def statements(self) -> list[Statement]:
-        return deepcopy(self._statements)
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, dirty: bool) -> None:
+        pass
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @version.setter
+    def version(self, version: int) -> None:
+        pass
+
+    def mark_saved(self) -> None:
+        self._dirty = False
+
+    @property
+    def statements(self) -> SequenceView:
+        return SequenceView(self._statements, StatementView)
 
     @statements.setter
     def statements(self, statements: list[Statement]) -> None:
         pass
 
     @property
-    def policies(self) -> list[Policy]:
-        return deepcopy(self._policies)
+    def policies(self) -> SequenceView:
+        # Posted policies already have both movements set, so their setters can't change them anymore
+        return SequenceView(self._policies)
 
     @policies.setter
+    @timed("exercise.post")
     def policies(self, policy: Policy) -> None:
-        id_statement_credit = policy.credit.account_id // 100000
-        id_statement_debit = policy.debit.account_id // 100000
+        self._validate_policy(policy)
+        self._post_policy(policy)
 
-        if id_statement_credit < 1 or id_statement_credit > 5:
-            raise Exception("ERROR: Credit account ID '" + str(policy.credit.account_id) + "' doesn't belong to any any statement")
-        if id_statement_debit < 1 or id_statement_debit > 5:
-            raise Exception("ERROR: Debit account ID '" + str(policy.credit.account_id) + "' doesn't belong to any any statement")
+    def policy(self, invoice: int) -> Policy:
+        if invoice not in self._invoices:
+            raise Exception("ERROR: Policy invoice '" + str(invoice) + "' doesn't exist.")
 
-        self._statements[id_statement_credit - 1].account_movement(policy.credit)
-        self._statements[id_statement_debit - 1].account_movement(policy.debit)
+        return self._policies[self._invoices[invoice]]
 
-        self._policies.append(policy)
+    def policies_between(self, start: datetime, end: datetime) -> list[Policy]:
+        if len(self._date_order) != len(self._policies):
+            self._date_order = array("q", sorted(range(len(self._policies)), key=lambda index: self._policies[index].date))
+            self._dates = [self._policies[index].date for index in self._date_order]
+
+        first = bisect_left(self._dates, start)
+        last = bisect_left(self._dates, end)
+
+        return [self._policies[index] for index in self._date_order[first:last]]
+
+    def postings_for(self, account_id: int) -> list[Policy]:
+        id_statement = account_id // 100000
+
+        if id_statement < 1 or id_statement > 5 or account_id not in self._statements[id_statement - 1].account_map:
+            raise Exception("ERROR: Account '" + str(account_id) + "' doesn't exist.")
+
+        account = self._statements[id_statement - 1].account_map[account_id]
+
+        # Movements recorded straight into the account don't belong to any policy
+        indexes = sorted({self._movements.policy(row) for row, cents in account.ledger()} - {-1})
+
+        return [self._policies[index] for index in indexes]
+
+    @timed("exercise.post_many")
+    def post_many(self, policies: Iterable[Policy]) -> list[Policy]:
+        lst = []
+        invoices = set()
+
+        for policy in policies:
+            try:
+                self._validate_policy(policy)
+
+                if policy.invoice in invoices:
+                    raise Exception("ERROR: Policy invoice '" + str(policy.invoice) + "' already exists.")
+            except Exception as e:
+                raise Exception(f"ERROR: Policy {len(lst) + 1} of the batch isn't valid. {e}")
+
+            lst.append(policy)
+            invoices.add(policy.invoice)
+
+        for policy in lst:
+            self._post_policy(policy)
+
+        count("exercise.policies_posted", len(lst))
+
+        return lst
 
     def add_account(self, account_id: int, name: str) -> None:
         id_account = account_id // 100000
@@ -145,10 +387,37 @@ class Exercise:
             raise Exception("ERROR: Account ID '" + str(account_id) + "' doesn't belong to any any statement")
 
         self._statements[id_account - 1].add_account(account_id, name)
+        self._chart.add_account(account_id, name)
+        self._account_index = None
+        self._dirty = True
+        self._version += 1
+
+    def add_group(self, group_id: int, name: str) -> None:
+        self._chart.add_group(group_id, name)
+        self._dirty = True
+        self._version += 1
+
+    def groups(self) -> dict[int, str]:
+        return self._chart_of_accounts().groups()
+
+    def rollup(self, depth: int = 4) -> list[tuple[int, str, int, AccountMovement]]:
+        if depth < 1:
+            raise Exception("ERROR: Depth '" + str(depth) + "' must be at least 1.")
+
+        return list(self._chart_of_accounts().rollup(depth))
 
     def next_policy_invoice(self) -> int:
         return len(self._policies) + 1
 
+    def search_accounts(self, prefix: str, limit: int = 20) -> list[tuple[int, str]]:
+        # The index is sorted once and kept until an account is added
+        index = self._account_index
+
+        if index is None:
+            index = self._account_index = AccountIndex(self._account_names())
+
+        return index.search(prefix, limit)
+
     def get_all_accounts(self) -> list[str]:
         lst = []
 
@@ -158,20 +427,69 @@ class Exercise:
 
         return lst
 
+    @timed("exercise.account_balances")
+    def account_balances(self) -> dict[int, AccountMovement]:
+        totals = self._movements.balances()
+        res = {}
+
+        for statement in self._statements:
+            for account_id in statement.accounts:
+                debit_balance = totals.get(account_id, 0)
+
+                if debit_balance < 0:
+                    res[account_id] = AccountMovement(000000, Money.from_cents(-debit_balance), "C")
+                elif debit_balance > 0:
+                    res[account_id] = AccountMovement(000000, Money.from_cents(debit_balance), "D")
+                else:
+                    res[account_id] = AccountMovement(000000, Money.from_cents(0), statement.nature)
+
+        return res
+
+    def trial_balance(self) -> Iterator[tuple[int, str, Money, Money, Money]]:
+        for statement in self._statements:
+            for account in statement.accounts.values():
+                balance = account.debit_balance - account.credit_balance
+
+                yield account.account_id, account.name, Money.from_cents(account.debit_balance), Money.from_cents(account.credit_balance), Money.from_cents(balance if statement.nature == "D" else -balance)
+
+    def general_ledger(self) -> Iterator[tuple[int, str, datetime, int, str, Money, Money, Money]]:
+        for statement in self._statements:
+            sign = 1 if statement.nature == "D" else -1
+
+            for account in statement.accounts.values():
+                balance = 0
+
+                for row, cents in account.ledger():
+                    balance += sign * cents
+
+                    # Movements recorded straight into the account don't belong to any policy, so they only count in the balance
+                    if self._movements.policy(row) < 0:
+                        continue
+
+                    policy = self._policies[self._movements.policy(row)]
+
+                    yield account.account_id, account.name, policy.date, policy.invoice, policy.description, Money.from_cents(max(cents, 0)), Money.from_cents(max(-cents, 0)), Money.from_cents(balance)
+
+    def statement_balances(self, as_of: datetime = None) -> list[Money]:
+        return self._statement_balances(as_of)
+
+    @cached("check_accounting_equation")
     def check_accounting_equation(self) -> bool:
-        return self._statements[0].balance() == (self._statements[1].balance() + self._statements[2].balance() + self._statements[3].balance() - self._statements[4].balance())
+        bal_assets, bal_liabilities, bal_common_stock, bal_revenue, bal_expenses = self._statement_balances()
 
-    def balance_sheet(self) -> str:
-        bal_assets = self._statements[0].balance()
-        bal_liabilities = self._statements[1].balance()
-        bal_common_stock = self._statements[2].balance()
-        bal_revenue = self._statements[3].balance()
-        bal_expenses = self._statements[4].balance()
+        return bal_assets == (bal_liabilities + bal_common_stock + bal_revenue - bal_expenses)
+
+    @cached("balance_sheet")
+    @timed("exercise.balance_sheet")
+    def balance_sheet(self, as_of: datetime = None) -> str:
+        bal_assets, bal_liabilities, bal_common_stock, bal_revenue, bal_expenses = self._statement_balances(as_of)
 
         res = "=" * 29 + "EXERCISE" + "=" * 29 + "\n"
         res += f"  Company Name: {self._company_name}\n"
         res += f"  Name: {self._name}\n"
-        res += f"  Exercise: {self._exercise.strftime('%Y')}\n\n"
+        res += f"  Exercise: {self._exercise.strftime('%Y')}\n"
+        res += f"  As of: {as_of.strftime('%Y-%m-%d %H:%M')}\n" if as_of is not None else ""
+        res += "\n"
         res += f"    Assets                          {'-' if bal_assets < 0 else ''}${abs(bal_assets)}\n"
         res += f"    Expenses                     {'-' if bal_expenses < 0 else ''}${abs(bal_expenses)}\n"
         res += f"      Liabilities                                          {'-' if bal_liabilities < 0 else ''}${abs(bal_liabilities)}\n"
@@ -183,9 +501,29 @@ class Exercise:
 
         return res
 
+    @cached("detailed_balance_sheet")
+    @timed("exercise.detailed_balance_sheet")
+    def detailed_balance_sheet(self, depth: int = 3) -> str:
+        lst = self.rollup(depth)
+
+        res = "=" * 29 + "EXERCISE" + "=" * 29 + "\n"
+        res += f"  Company Name: {self._company_name}\n"
+        res += f"  Name: {self._name}\n"
+        res += f"  Exercise: {self._exercise.strftime('%Y')}\n\n"
+
+        for node_id, name, level, balance in lst:
+            # Balances against the nature of their statement are shown as negative, like in the balance sheet
+            nature = STATEMENTS[node_id // 10 ** (len(str(node_id)) - 1) - 1][1].upper()
+            res += f"{'  ' * level}{node_id} {name}".ljust(40) + f"{'  ' * level}{'-' if balance.d_c != nature and balance.quantity > 0 else ''}${balance.quantity}\n"
+
+        res += "=" * 66
+
+        return res
+
+    @cached("income_statement")
+    @timed("exercise.income_statement")
     def income_statement(self) -> str:
-        bal_revenue = self._statements[3].balance()
-        bal_expenses = self._statements[4].balance()
+        bal_revenue, bal_expenses = self._statement_balances()[3:]
         bal_utilities = bal_revenue - bal_expenses
 
         res = "=" * 29 + "EXERCISE" + "=" * 29 + "\n"
@@ -199,44 +537,170 @@ class Exercise:
 
         return res
 
-    def close_book(self) -> dict[str: int]:
-        try:
-            self._statements[2].add_account(300100, "Retained Earnings")
-        except Exception:
-            pass
+    @cached("report")
+    @timed("exercise.report")
+    def report(self, as_of: datetime = None) -> ExerciseReport:
+        return ExerciseReport(self._company_name, self._name, self._statement_balances(as_of), self.balance_sheet(as_of), self.income_statement(), self.check_accounting_equation())
 
-        revenue_bal = 0
-        expenses_bal = 0
+    def clear_cache(self) -> None:
+        self._cache.clear()
 
-        for account in self._statements[3].accounts.values():
-            account_balance = account.balance()
+    def closing_summary(self) -> ClosingSummary:
+        revenue_bal = Money(0)
+        expenses_bal = Money(0)
+        debits = []
+        credits = []
+        closed_accounts = 0
 
-            policy = Policy(self.next_policy_invoice(), f"Closing revenue account '{account.name}'.")
-            policy.debit = AccountMovement(account.account_id, account_balance.quantity, "d")
-            policy.credit = AccountMovement(300100, account_balance.quantity, "c")
-            self.policies = policy
+        # Every account is closed against its own balance, so accounts with a contra balance are closed too
+        for account_id, account_balance in self.account_balances().items():
+            statement = account_id // 100000 - 1
 
-            revenue_bal += account_balance.quantity
+            if statement not in (3, 4) or not account_balance.quantity:
+                continue
 
-        for account in self._statements[4].accounts.values():
-            account_balance = account.balance()
+            if account_balance.d_c == "C":
+                debits.append(AccountMovement(account_id, account_balance.quantity, "d"))
+            else:
+                credits.append(AccountMovement(account_id, account_balance.quantity, "c"))
 
-            policy = Policy(self.next_policy_invoice(), f"Closing expenses account '{account.name}'.")
-            policy.debit = AccountMovement(300100, account_balance.quantity, "d")
-            policy.credit = AccountMovement(account.account_id, account_balance.quantity, "c")
-            self.policies = policy
+            closed_accounts += 1
 
-            expenses_bal += account_balance.quantity
+            if statement == 3:
+                revenue_bal += account_balance.quantity if account_balance.d_c == "C" else -account_balance.quantity
+            else:
+                expenses_bal += account_balance.quantity if account_balance.d_c == "D" else -account_balance.quantity
 
-        income_tax = 0.3 * (revenue_bal - expenses_bal)
+        operating_income = revenue_bal - expenses_bal
+        income_tax = 0.3 * operating_income if operating_income > 0 else Money(0)
 
         if income_tax > 0:
+            credits.append(AccountMovement(200100, income_tax, "c"))
+
+        # Retained earnings takes the net income or loss, so it appears only once in the policy
+        if operating_income - income_tax > 0:
+            credits.append(AccountMovement(300100, operating_income - income_tax, "c"))
+        elif operating_income - income_tax < 0:
+            debits.append(AccountMovement(300100, income_tax - operating_income, "d"))
+
+        policy = None
+
+        if debits and credits:
+            policy = Policy(self.next_policy_invoice(), "Closing revenue and expenses accounts of exercise.", debits=debits, credits=credits)
+
+        return ClosingSummary(revenue_bal, expenses_bal, income_tax, policy, closed_accounts)
+
+    @timed("exercise.close_book")
+    def close_book(self) -> ClosingSummary:
+        try:
+            self.add_account(300100, "Retained Earnings")
+        except Exception:
+            pass
+
+        summary = self.closing_summary()
+
+        if summary.income_tax > 0:
             try:
-                self._statements[1].add_account(200100, "Income Tax Payable")
+                self.add_account(200100, "Income Tax Payable")
             except Exception:
                 pass
 
-            policy = Policy(self.next_policy_invoice(), "Income Tax Payable of Exercise.")
-            policy.debit = AccountMovement(300100, income_tax, "d")
-            policy.credit = AccountMovement(200100, income_tax, "c")
-            self.policies = policy
+        if summary.policy is not None:
+            self.policies = summary.policy
+
+        return summary
+
+    @timed("exercise.rollover")
+    def rollover(self, name: str) -> "Exercise":
+        # Revenue and expenses must be in retained earnings already, otherwise the opening policy wouldn't balance
+        if self.closing_summary().policy is not None:
+            raise Exception("ERROR: The book of exercise '" + self._name + "' must be closed before rolling it over.")
+
+        res = Exercise(self._company_name, name)
+        debits = []
+        credits = []
+
+        for group_id, group_name in self.groups().items():
+            res.add_group(group_id, group_name)
+
+        for account_id, account_name in sorted(self._account_names()):
+            res.add_account(account_id, account_name)
+
+        # Assets, liabilities and equity carry over, revenue and expenses start again from zero
+        for account_id, account_balance in self.account_balances().items():
+            if account_id // 100000 > 3 or not account_balance.quantity:
+                continue
+
+            if account_balance.d_c == "D":
+                debits.append(AccountMovement(account_id, account_balance.quantity, "d"))
+            else:
+                credits.append(AccountMovement(account_id, account_balance.quantity, "c"))
+
+        if debits or credits:
+            res.policies = Policy(res.next_policy_invoice(), "Opening balances from exercise '" + self._name + "'.", debits=debits, credits=credits)
+
+        return res
+
+    def _validate_policy(self, policy: Policy) -> None:
+        if policy.credit is None or policy.debit is None:
+            raise Exception("ERROR: Policy must have a credit and a debit.")
+
+        if not policy.balanced():
+            raise Exception("ERROR: Credit and debit is not balanced.")
+
+        if policy.invoice in self._invoices:
+            raise Exception("ERROR: Policy invoice '" + str(policy.invoice) + "' already exists.")
+
+        for account_movement in (*policy.credits, *policy.debits):
+            id_statement = account_movement.account_id // 100000
+
+            if id_statement < 1 or id_statement > 5:
+                raise Exception(f"ERROR: {'Credit' if account_movement.d_c == 'C' else 'Debit'} account ID '" + str(account_movement.account_id) + "' doesn't belong to any any statement")
+
+            if account_movement.account_id not in self._statements[id_statement - 1].account_map:
+                raise Exception("ERROR: Account '" + str(account_movement.account_id) + "' doesn't exist.")
+
+            if account_movement.d_c not in ("D", "C"):
+                raise Exception("ERROR: Account Movement d_c's '" + account_movement.d_c + "' isn't a valid type.")
+
+    def _post_policy(self, policy: Policy) -> None:
+        start = len(self._movements)
+        movements = (*policy.credits, *policy.debits)
+
+        # A policy already posted to another exercise keeps reading that exercise's store, this one posts a copy
+        if len(policy.rows) > 0:
+            policy = Policy(policy.invoice, policy.description, policy.date)
+
+        # A compound policy is still a single entry, all its movements are linked to the same policy index
+        for account_movement in movements:
+            self._statements[account_movement.account_id // 100000 - 1].account_movement(account_movement, len(self._policies), policy.date)
+            self._chart.record(account_movement.account_id, account_movement.quantity.cents if account_movement.d_c == "D" else -account_movement.quantity.cents)
+
+        policy.bind(self._movements, start, len(self._movements))
+
+        # Policies posted in date order extend the date index, any other leaves it to be sorted when it's read
+        if len(self._date_order) == len(self._policies) and (len(self._dates) == 0 or policy.date >= self._dates[-1]):
+            self._dates.append(policy.date)
+            self._date_order.append(len(self._policies))
+
+        self._invoices[policy.invoice] = len(self._policies)
+        self._policies.append(policy)
+        self._dirty = True
+        self._version += 1
+
+    def _report_statements(self) -> Iterable[Statement]:
+        return self._statements
+
+    def _account_names(self) -> Iterable[tuple[int, str]]:
+        return ((account.account_id, account.name) for statement in self._statements for account in statement.accounts.values())
+
+    def _chart_of_accounts(self) -> ChartOfAccounts:
+        return self._chart
+
+    def _report_policies(self) -> Iterable[Policy]:
+        return self._policies
+
+    @timed("exercise.statement_balances")
+    def _statement_balances(self, as_of: datetime = None) -> list[Money]:
+        return [statement.balance(as_of) for statement in self._statements]
+
@@ -0,0 +1,104 @@
+from Accounting.classes.money import Money
+
+
+class ExerciseReport:
+
+    """
+        Reports of a single exercise, computed apart from the exercise so they can be sent between processes.
+
+        Attributes:
+        -----------
+        company name : str
+            The name of the company.
+        name : str
+            The name of the exercise.
+        balances : list[Money]
+            The balances of the exercise's statements (Assets, Liabilities, Common Stock, Revenue and Expenses).
+        balance sheet : str
+            The balance sheet of the exercise.
+        income statement : str
+            The income statement of the exercise.
+        balanced : bool
+            True if the exercise satisfies the accounting equation.
+
+        Methods:
+        --------
+        __init__(company_name: str, name: str, balances: list[Money], balance_sheet: str, income_statement: str, balanced: bool):
+            Initializes a new ExerciseReport instance with the given parameters.
+        __str__() -> str:
+            Returns the balance sheet and the income statement of the exercise.
+        company_name() -> str:
+            Returns the company name attribute.
+        name() -> str:
+            Returns the name attribute.
+        balances() -> list[Money]:
+            Returns a copy of the balances attribute.
+        balance_sheet() -> str:
+            Returns the balance sheet attribute.
+        income_statement() -> str:
+            Returns the income statement attribute.
+        balanced() -> bool:
+            Returns the balanced attribute.
+    """
+
+    def __init__(self, company_name: str, name: str, balances: list[Money], balance_sheet: str, income_statement: str, balanced: bool):
+        self._company_name = company_name
+        self._name = name
+        self._balances = balances
+        self._balance_sheet = balance_sheet
+        self._income_statement = income_statement
+        self._balanced = balanced
+
+    def __str__(self) -> str:
+        res = f"{self._balance_sheet}\n{self._income_statement}"
+        res += "" if self._balanced else "\nThe accounting equation is unbalanced"
+
+        return res
+
+    @property
+    def company_name(self) -> str:
+        return self._company_name
+
+    @company_name.setter
+    def company_name(self, company_name: str) -> None:
+        pass
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        pass
+
+    @property
+    def balances(self) -> list[Money]:
+        return self._balances.copy()
+
+    @balances.setter
+    def balances(self, balances: list[Money]) -> None:
+        pass
+
+    @property
+    def balance_sheet(self) -> str:
+        return self._balance_sheet
+
+    @balance_sheet.setter
+    def balance_sheet(self, balance_sheet: str) -> None:
+        pass
+
+    @property
+    def income_statement(self) -> str:
+        return self._income_statement
+
+    @income_statement.setter
+    def income_statement(self, income_statement: str) -> None:
+        pass
+
+    @property
+    def balanced(self) -> bool:
+        return self._balanced
+
+    @balanced.setter
+    def balanced(self, balanced: bool) -> None:
+        pass
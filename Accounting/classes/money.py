@@ -0,0 +1,123 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+
+# cents per dollar, amounts are stored as integer cents without their scale (movement store, snapshots and the
+# SQLite ledger), so changing it would silently rescale every stored amount
+SCALE = 100
+
+
+class Money:
+
+    """
+        Exact amount of money, stored as an integer number of cents.
+
+        All the arithmetic is done on the integer cents, so sums and comparisons are exact. Plain numbers and
+        strings mixed with Money in arithmetic and ordering are read as dollars, so Money(0.1) + 0.2 == Money(0.3)
+        is True. Equality only holds between Money instances, so equal amounts always have the same hash.
+
+        Attributes:
+        -----------
+        cents : int
+            The amount expressed in cents.
+
+        Methods:
+        --------
+        __init__(value: Money | int | float | str | Decimal = 0):
+            Initializes a new Money instance from an amount in dollars, rounding half up to the cent.
+        from_cents(cents: int) -> Money:
+            Returns a new Money instance from an amount in cents.
+        __str__() -> str:
+            Returns the amount in dollars with two decimals.
+        cents() -> int:
+            Returns the amount in cents.
+    """
+
+    __slots__ = ("_cents",)
+
+    def __init__(self, value=0):
+        if isinstance(value, Money):
+            self._cents = value._cents
+        elif isinstance(value, int):
+            self._cents = value * SCALE
+        else:
+            self._cents = int((Decimal(str(value).strip()) * SCALE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+    @staticmethod
+    def from_cents(cents: int) -> "Money":
+        res = Money.__new__(Money)
+        res._cents = cents
+
+        return res
+
+    def __str__(self) -> str:
+        digits = len(str(SCALE)) - 1
+        cents = abs(self._cents)
+
+        return f"{'-' if self._cents < 0 else ''}{cents // SCALE}.{cents % SCALE:0{digits}d}"
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    def __reduce__(self):
+        return Money.from_cents, (self._cents,)
+
+    @property
+    def cents(self) -> int:
+        return self._cents
+
+    @cents.setter
+    def cents(self, cents: int) -> None:
+        pass
+
+    def __add__(self, other) -> "Money":
+        return Money.from_cents(self._cents + Money(other)._cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> "Money":
+        return Money.from_cents(self._cents - Money(other)._cents)
+
+    def __rsub__(self, other) -> "Money":
+        return Money.from_cents(Money(other)._cents - self._cents)
+
+    def __mul__(self, rate) -> "Money":
+        return Money.from_cents(int((self._cents * Decimal(str(rate))).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Money":
+        return Money.from_cents(-self._cents)
+
+    def __pos__(self) -> "Money":
+        return self
+
+    def __abs__(self) -> "Money":
+        return Money.from_cents(abs(self._cents))
+
+    def __bool__(self) -> bool:
+        return self._cents != 0
+
+    def __float__(self) -> float:
+        return self._cents / SCALE
+
+    def __hash__(self) -> int:
+        return hash(self._cents)
+
+    def __eq__(self, other) -> bool:
+        # Only Money is compared, a number equal to it would have another hash
+        if not isinstance(other, Money):
+            return NotImplemented
+
+        return self._cents == other._cents
+
+    def __lt__(self, other) -> bool:
+        return self._cents < Money(other)._cents
+
+    def __le__(self, other) -> bool:
+        return self._cents <= Money(other)._cents
+
+    def __gt__(self, other) -> bool:
+        return self._cents > Money(other)._cents
+
+    def __ge__(self, other) -> bool:
+        return self._cents >= Money(other)._cents
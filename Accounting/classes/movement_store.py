@@ -0,0 +1,142 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.money import Money
+
+from array import array
+
+
+class MovementStore:
+
+    """
+        Columnar storage for account movements, one typed array per field.
+
+        Accounts and posted policies keep the indexes of their movements in the store instead of AccountMovement
+        objects, so the store is the only copy of every movement and each one costs a few bytes per column instead
+        of a whole Python object. The columns are returned as copies, so they can't be modified from outside the
+        store, and they are pickled as arrays.
+
+        Attributes:
+        -----------
+        account ids : array[int]
+            The account id of every movement.
+        amounts : array[int]
+            The amount of every movement in cents.
+        directions : array[int]
+            The direction of every movement, 1 for debits and -1 for credits.
+        policies : array[int]
+            The index of the policy every movement belongs to, -1 if it doesn't belong to any policy.
+
+        Methods:
+        --------
+        __init__():
+            Initializes a new empty MovementStore instance.
+        __len__() -> int:
+            Returns the number of movements in the store.
+        append(account_movement: AccountMovement, policy: int = -1) -> int:
+            Stores the account movement and returns its index.
+            Raises exception if the AccountMovement's d_c isn't a valid option.
+        movement(index: int) -> AccountMovement:
+            Returns the account movement stored at the given index.
+        movements(start: int, stop: int, d_c: str) -> list[AccountMovement]:
+            Returns the debits ('D') or credits ('C') stored from start to stop (exclusive), in the order they were stored.
+        signed_cents(index: int) -> int:
+            Returns the debit minus credit in cents of the movement stored at the given index.
+        policy(index: int) -> int:
+            Returns the index of the policy the movement stored at the given index belongs to.
+        balances() -> dict[int, int]:
+            Returns the debits minus the credits in cents of every account with movements, in a single pass over
+            the columns, vectorized with NumPy when it is installed.
+    """
+
+    def __init__(self):
+        self._account_ids = array("q")
+        self._amounts = array("q")
+        self._directions = array("b")
+        self._policies = array("q")
+
+    def __len__(self) -> int:
+        return len(self._account_ids)
+
+    @property
+    def account_ids(self) -> array:
+        return self._account_ids[:]
+
+    @account_ids.setter
+    def account_ids(self, account_ids: array) -> None:
+        pass
+
+    @property
+    def amounts(self) -> array:
+        return self._amounts[:]
+
+    @amounts.setter
+    def amounts(self, amounts: array) -> None:
+        pass
+
+    @property
+    def directions(self) -> array:
+        return self._directions[:]
+
+    @directions.setter
+    def directions(self, directions: array) -> None:
+        pass
+
+    @property
+    def policies(self) -> array:
+        return self._policies[:]
+
+    @policies.setter
+    def policies(self, policies: array) -> None:
+        pass
+
+    def append(self, account_movement: AccountMovement, policy: int = -1) -> int:
+        if account_movement.d_c == "D":
+            self._directions.append(1)
+        elif account_movement.d_c == "C":
+            self._directions.append(-1)
+        else:
+            raise Exception("ERROR: Account Movement d_c's '" + account_movement.d_c + "' isn't a valid type.")
+
+        self._account_ids.append(account_movement.account_id)
+        self._amounts.append(account_movement.quantity.cents)
+        self._policies.append(policy)
+
+        return len(self._account_ids) - 1
+
+    def movement(self, index: int) -> AccountMovement:
+        return AccountMovement(self._account_ids[index], Money.from_cents(self._amounts[index]), "D" if self._directions[index] == 1 else "C")
+
+    def movements(self, start: int, stop: int, d_c: str) -> list[AccountMovement]:
+        direction = 1 if d_c == "D" else -1
+
+        return [self.movement(index) for index in range(start, stop) if self._directions[index] == direction]
+
+    def signed_cents(self, index: int) -> int:
+        return self._amounts[index] * self._directions[index]
+
+    def policy(self, index: int) -> int:
+        return self._policies[index]
+
+    def balances(self) -> dict[int, int]:
+        # NumPy is only imported when the balances are first needed, so loading an exercise doesn't pay for it
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        if numpy is None:
+            res = {}
+
+            for account_id, amount, direction in zip(self._account_ids, self._amounts, self._directions):
+                res[account_id] = res.get(account_id, 0) + amount * direction
+
+            return res
+
+        # The NumPy arrays share the columns' memory, they must not outlive this call or the columns couldn't grow
+        account_ids = numpy.frombuffer(self._account_ids, dtype=numpy.int64)
+        signed_amounts = numpy.frombuffer(self._amounts, dtype=numpy.int64) * numpy.frombuffer(self._directions, dtype=numpy.int8)
+
+        keys, positions = numpy.unique(account_ids, return_inverse=True)
+        sums = numpy.zeros(len(keys), dtype=numpy.int64)
+        numpy.add.at(sums, positions, signed_amounts)
+
+        return dict(zip(keys.tolist(), sums.tolist()))
@@ -1,7 +1,8 @@
 from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.movement_store import MovementStore
 
+from collections.abc import Iterable, Iterator
 from datetime import datetime
-from copy import deepcopy
 
 
 class Policy:
@@ -9,6 +10,12 @@ class Policy:
     """
         Represents a policy with credit and debit movements.
 
+        A simple policy has one debit and one credit, a compound policy has any number of each as long as the total
+        of the debits matches the total of the credits.
+
+        Once posted, the policy's movements are only kept by the exercise's MovementStore and the policy reads
+        them back from its rows, so posting a policy doesn't keep a second copy of every movement.
+
         Attributes:
         -----------
         invoice : int
@@ -17,54 +24,123 @@ class Policy:
             A short description of the policy.
         date : datetime
             The date and time when the policy was created.
-        credit : AccountMovement
-            The credit movement associated with the policy.
-        debit : AccountMovement
-            The debit movement associated with the policy.
+        credits : tuple[AccountMovement]
+            The credit movements associated with the policy, until it's posted.
+        debits : tuple[AccountMovement]
+            The debit movements associated with the policy, until it's posted.
+        store : MovementStore
+            The store holding the movements of the policy once it's posted, None until then.
+        rows : range
+            The rows of the store holding the movements of the policy once it's posted.
 
         Methods:
         --------
-        __init__(invoice: int, description: str):
-            Initializes a new Policy instance with the given parameters.
+        __init__(invoice: int, description: str, date: datetime = None, debits: list[AccountMovement] = None, credits: list[AccountMovement] = None):
+            Initializes a new Policy instance with the given parameters, dated now unless a date is given.
+            Raises exception if a debit isn't a debit or a credit isn't a credit.
+            Raises exception if both debits and credits are given and their totals don't match or they share an account.
         __str__() -> str:
             Returns a string representation of the policy instance.
+        iter_report_lines() -> Iterator[str]:
+            Yields the lines of the string representation of the policy instance, one at a time.
         invoice() -> int:
             Returns the invoice attribute.
         description() -> str:
             Returns the description attribute.
         date() -> datetime:
             Returns the date attribute
+        credits() -> tuple[AccountMovement]:
+            Returns the credits attribute.
+        debits() -> tuple[AccountMovement]:
+            Returns the debits attribute.
         credit() -> AccountMovement:
-            Returns the credit attribute
+            Returns the first credit, None if there isn't any.
         credit(credit: AccountMovement) -> None:
-            Sets the credit attribute if none have been set.
+            Sets the only credit if none have been set.
             Raises exception if credit balance and debit balance don't match or credit and debit accounts are the same.
         debit() -> AccountMovement:
-            Returns the debit attribute.
+            Returns the first debit, None if there isn't any.
         debit(debit: AccountMovement) -> None:
-            Sets the debit attribute if none have been set.
+            Sets the only debit if none have been set.
             Raises exception if credit balance and debit balance don't match or credit and debit accounts are the same.
+        balanced() -> bool:
+            Returns True if the policy has debits and credits and their totals match.
+        rows() -> range:
+            Returns the rows of the store holding the policy's movements, an empty range if it isn't posted.
+        bind(store: MovementStore, start: int, stop: int) -> None:
+            Drops the policy's own movements, which are read from the given rows of the store from then on.
+            Raises exception if the policy is already posted.
 
     """
 
-    def __init__(self, invoice: int, description: str):
+    __slots__ = ("_invoice", "_description", "_date", "_credits", "_debits", "_store", "_start", "_stop")
+
+    def __init__(self, invoice: int, description: str, date: datetime = None, debits: list[AccountMovement] = None, credits: list[AccountMovement] = None):
         self._invoice = invoice
         self._description = description
-        self._date = datetime.now()
-        self._credit: AccountMovement = None
-        self._debit: AccountMovement = None
+        self._date = datetime.now() if date is None else date
+        self._credits: tuple[AccountMovement, ...] = ()
+        self._debits: tuple[AccountMovement, ...] = ()
+        self._store: MovementStore = None
+        self._start = 0
+        self._stop = 0
+
+        for debit in debits or ():
+            if debit.d_c != "D":
+                raise Exception("ERROR: AccountMovement isn't a debit.")
+
+        for credit in credits or ():
+            if credit.d_c != "C":
+                raise Exception("ERROR: AccountMovement isn't a credit.")
+
+        if debits and credits:
+            Policy._check(debits, credits)
+
+        self._debits = tuple(debits or ())
+        self._credits = tuple(credits or ())
+
+    def __reduce__(self):
+        # A policy pickled on its own carries its movements, exercises pickle the store instead of their policies
+        return Policy, (self._invoice, self._description, self._date), {"_credits": self.credits, "_debits": self.debits}
+
+    def __setstate__(self, state) -> None:
+        # Policies pickled by the default __slots__ reduction have a (None, state) tuple instead of a dict
+        if isinstance(state, tuple):
+            state = state[1]
+
+        # Policies pickled before compound policies had a single '_credit' and '_debit'
+        if "_credit" in state:
+            state = dict(state)
+            credit = state.pop("_credit")
+            debit = state.pop("_debit")
+            state["_credits"] = (credit,) if credit is not None else ()
+            state["_debits"] = (debit,) if debit is not None else ()
+
+        # Pickled policies are never bound, the default __slots__ reduction doesn't even call __init__
+        self._store = None
+        self._start = 0
+        self._stop = 0
+
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
 
     def __str__(self) -> str:
-        res = "=" * 27 + "POLICY" + "=" * 27 + "\n"
-        res += f"  Invoice: {self._invoice}\n"
-        res += f"  Description: \"{self._description}\"\n"
-        res += f"  Date: {self._date.strftime('%A')} {self._date.strftime('%B')} {self._date.strftime('%d')} {self._date.strftime('%Y')}\n"
-        res += f"  Movements:\n"
-        res += f"      {self._debit}\n"
-        res += f"        {self._credit}\n"
+        return "\n".join(self.iter_report_lines())
+
+    def iter_report_lines(self) -> Iterator[str]:
+        yield "=" * 27 + "POLICY" + "=" * 27
+        yield f"  Invoice: {self._invoice}"
+        yield f"  Description: \"{self._description}\""
+        yield f"  Date: {self._date.strftime('%A')} {self._date.strftime('%B')} {self._date.strftime('%d')} {self._date.strftime('%Y')}"
+        yield f"  Movements:"
 
-        res += "=" * 60
-        return res
+        for debit in self.debits:
+            yield f"      {debit}"
+
+        for credit in self.credits:
+            yield f"        {credit}"
+
+        yield "=" * 60
 
     @property
     def invoice(self) -> int:
@@ -84,38 +160,94 @@ class Policy:
 
     @property
     def date(self) -> datetime:
-        return deepcopy(self._date)
+        # datetime is immutable, so there is no need to copy it
+        return self._date
 
     @date.setter
     def date(self, date: str) -> None:
         pass
 
+    @property
+    def credits(self) -> tuple[AccountMovement, ...]:
+        if self._store is None:
+            return self._credits
+
+        return tuple(self._store.movements(self._start, self._stop, "C"))
+
+    @credits.setter
+    def credits(self, credits: tuple[AccountMovement, ...]) -> None:
+        pass
+
+    @property
+    def debits(self) -> tuple[AccountMovement, ...]:
+        if self._store is None:
+            return self._debits
+
+        return tuple(self._store.movements(self._start, self._stop, "D"))
+
+    @debits.setter
+    def debits(self, debits: tuple[AccountMovement, ...]) -> None:
+        pass
+
     @property
     def credit(self) -> AccountMovement:
-        return self._credit
+        credits = self.credits
+
+        return credits[0] if len(credits) > 0 else None
 
     @credit.setter
     def credit(self, credit: AccountMovement) -> None:
-        if self._credit is None:
-            if self._debit is not None:
-                if self._debit.quantity != credit.quantity:
-                    raise Exception("ERROR: Credit and debit is not balanced.")
-                elif self._debit.account_id == credit.account_id:
-                    raise Exception("ERROR: Credit and debit accounts can not be the same.")
+        if self._store is None and len(self._credits) == 0:
+            if len(self._debits) > 0:
+                Policy._check(self._debits, [credit])
 
-            self._credit = credit
+            self._credits = (credit,)
 
     @property
     def debit(self) -> AccountMovement:
-        return self._debit
+        debits = self.debits
+
+        return debits[0] if len(debits) > 0 else None
 
     @debit.setter
     def debit(self, debit: AccountMovement) -> None:
-        if self._debit is None:
-            if self._credit is not None:
-                if self._credit.quantity != debit.quantity:
-                    raise Exception("ERROR: Credit and debit is not balanced.")
-                elif debit.account_id == self._credit.account_id:
-                    raise Exception("ERROR: Credit and debit accounts can not be the same.")
-
-            self._debit = debit
+        if self._store is None and len(self._debits) == 0:
+            if len(self._credits) > 0:
+                Policy._check([debit], self._credits)
+
+            self._debits = (debit,)
+
+    def balanced(self) -> bool:
+        debits = self.debits
+        credits = self.credits
+
+        if len(debits) == 0 or len(credits) == 0:
+            return False
+
+        return sum(debit.quantity.cents for debit in debits) == sum(credit.quantity.cents for credit in credits)
+
+    @property
+    def rows(self) -> range:
+        return range(self._start, self._stop)
+
+    @rows.setter
+    def rows(self, rows: range) -> None:
+        pass
+
+    def bind(self, store: MovementStore, start: int, stop: int) -> None:
+        if self._store is not None:
+            raise Exception("ERROR: Policy '" + str(self._invoice) + "' is already posted.")
+
+        self._store = store
+        self._start = start
+        self._stop = stop
+        self._credits = ()
+        self._debits = ()
+
+    @staticmethod
+    def _check(debits: Iterable[AccountMovement], credits: Iterable[AccountMovement]) -> None:
+        if sum(debit.quantity.cents for debit in debits) != sum(credit.quantity.cents for credit in credits):
+            raise Exception("ERROR: Credit and debit is not balanced.")
+
+        if not {debit.account_id for debit in debits}.isdisjoint(credit.account_id for credit in credits):
+            raise Exception("ERROR: Credit and debit accounts can not be the same.")
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+import functools
+import threading
+
+
+class ReportCache:
+
+    """
+        Least recently used cache of rendered reports and computed balances.
+
+        Keys include the version of the exercise they were computed from, so a report is never served after the
+        exercise changes; stale entries are simply evicted first once the cache is full. The GUI reads reports
+        from both its main thread and its worker, so every access is locked, while the reports are computed
+        outside the lock.
+
+        Attributes:
+        -----------
+        maxsize : int
+            The maximum number of entries kept.
+        entries : OrderedDict[Hashable, object]
+            The cached values, least recently used first.
+
+        Methods:
+        --------
+        __init__(maxsize: int):
+            Initializes a new empty ReportCache instance that keeps up to maxsize entries.
+        __len__() -> int:
+            Returns the number of cached entries.
+        get(key: Hashable, compute: Callable[[], object]) -> object:
+            Returns the value cached for the key, computing it and caching it if there is none.
+        clear() -> None:
+            Removes all the cached entries.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        pass
+
+    def get(self, key: Hashable, compute: Callable[[], object]) -> object:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def cached(kind: str) -> Callable[[Callable], Callable]:
+    # Caches an exercise's method by kind, exercise version and arguments, the returned value must not be modified
+    def decorator(method: Callable) -> Callable:
+        signature = None
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            nonlocal signature
+
+            # inspect is slow to import, so it's only imported once a report is asked for, not when the CLI starts
+            if signature is None:
+                import inspect
+
+                signature = inspect.signature(method)
+
+            # Arguments are bound with their defaults, so positional, keyword and omitted ones share the same entry
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+
+            return self._cache.get((kind, self._version, tuple(bound.arguments.values())[1:]), lambda: method(*bound.args, **bound.kwargs))
+
+        return wrapper
+
+    return decorator
@@ -1,5 +1,12 @@
 from Accounting.classes.account_movement import AccountMovement
 from Accounting.classes.account import Account
+from Accounting.classes.movement_store import MovementStore
+from Accounting.classes.money import Money
+from Accounting.instrumentation import timed
+
+from collections.abc import Iterator
+from datetime import datetime
+from types import MappingProxyType
 
 
 class Statement:
@@ -15,49 +22,65 @@ class Statement:
             Statement's nature, "D" if debtor or "C" if creditor.
         accounts : dict[int: Accounts]
             All the statement's accounts with the account's ids as keys.
+        store : MovementStore
+            The store holding the movements of the statement's accounts.
+        balance : int
+            Running balance in cents of the statement, updated every time an account movement is recorded.
 
         Methods:
         --------
-        __init__(name: str, nature: str):
-            Initializes a new Statement instance with the given parameters.
+        __init__(name: str, nature: str, store: MovementStore = None):
+            Initializes a new Statement instance with the given parameters, with its own store if none is given.
         __str__() -> str:
             Returns a string representation of the statement instance.
+        iter_report_lines() -> Iterator[str]:
+            Yields the lines of the string representation of the statement instance, one at a time.
         name() -> str:
             Returns the name attribute.
         nature() -> str:
             Returns the nature attribute.
         accounts() -> dict[int: Accounts]:
             Returns the accounts attribute
+        account_map() -> MappingProxyType:
+            Returns a read-only view of the accounts attribute, nothing is copied.
         accounts(account: Account) -> None:
             Adds account.
             Raises exception if account id already exists in the accounts.
-        account_movement(account_movement: AccountMovement) -> None:
-            Record the account movement in the corresponding account.
+        account_movement(account_movement: AccountMovement, policy: int = -1, date: datetime = None) -> None:
+            Record the account movement posted on the given date in the corresponding account, linked to the given policy index.
             Raises exception if the AccountMovement's account id doesn't exist.
             Raises exception if the AccountMovement's d_c isn't a valid option.
+        balance(as_of: datetime = None) -> Money:
+            Returns the statement's running balance according to its nature, or the sum of its accounts' balances
+            up to the given date (inclusive).
     """
 
-    def __init__(self, name: str, nature: str):
+    def __init__(self, name: str, nature: str, store: MovementStore = None):
         self._name = name
         self._nature = nature.upper()
+        self._store = MovementStore() if store is None else store
         self._accounts: dict[int, Account] = {}
+        self._balance = 0
 
     def __str__(self) -> str:
+        return "\n".join(self.iter_report_lines())
+
+    def iter_report_lines(self) -> Iterator[str]:
         keys = sorted(self._accounts.keys())
         bal = self.balance()
 
-        res = "=" * 27 + "STATEMENT" + "=" * 27 + "\n"
-        res += f"  Name: {self._name}\n"
-        res += f"  Nature: {'Debtor' if self._nature == 'D' else 'Creditor'}\n"
-        res += f"  Balance: {'-' if bal < 0 else ''}${abs(bal)}\n"
-        res += f"  Accounts:\n" if len(keys) > 0 else ""
+        yield "=" * 27 + "STATEMENT" + "=" * 27
+        yield f"  Name: {self._name}"
+        yield f"  Nature: {'Debtor' if self._nature == 'D' else 'Creditor'}"
+        yield f"  Balance: {'-' if bal < 0 else ''}${abs(bal)}"
 
-        for key in keys:
-            res += f"{self._accounts[key]}\n"
+        if len(keys) > 0:
+            yield f"  Accounts:"
 
-        res += "=" * 64
+        for key in keys:
+            yield from self._accounts[key].iter_report_lines()
 
-        return res
+        yield "=" * 64
 
     @property
     def name(self) -> str:
@@ -79,34 +102,39 @@ class Statement:
     def accounts(self) -> dict[int: Account]:
         return self._accounts.copy()
 
+    @property
+    def account_map(self) -> MappingProxyType:
+        return MappingProxyType(self._accounts)
+
     def add_account(self, account_id: int, name: str) -> None:
         if account_id in self._accounts:
             raise Exception("ERROR: Account ID already exists.")
 
-        self._accounts[account_id] = Account(account_id, name, self._nature)
+        self._accounts[account_id] = Account(account_id, name, self._nature, self._store)
 
-    def account_movement(self, account_movement: AccountMovement) -> None:
+    def account_movement(self, account_movement: AccountMovement, policy: int = -1, date: datetime = None) -> None:
         if account_movement.account_id not in self._accounts:
             raise Exception("ERROR: Account '" + str(account_movement.account_id) + "' doesn't exist.")
 
-        if account_movement.d_c == "D":
-            self._accounts[account_movement.account_id].debits = account_movement
+        if account_movement.d_c not in ("D", "C"):
+            raise Exception("ERROR: Account Movement d_c's '" + account_movement.d_c + "' isn't a valid type.")
 
-        elif account_movement.d_c == "C":
-            self._accounts[account_movement.account_id].credits = account_movement
+        self._accounts[account_movement.account_id].record(account_movement, policy, date)
 
+        if account_movement.d_c == self._nature:
+            self._balance += account_movement.quantity.cents
         else:
-            raise Exception("ERROR: Account Movement d_c's '" + account_movement.d_c + "' isn't a valid type.")
+            self._balance -= account_movement.quantity.cents
+
+    @timed("statement.balance")
+    def balance(self, as_of: datetime = None) -> Money:
+        if as_of is None:
+            return Money.from_cents(self._balance)
 
-    def balance(self) -> int:
         res = 0
 
         for account in self._accounts.values():
-            account_balance = account.balance()
-
-            if account_balance.d_c == self._nature:
-                res += account_balance.quantity
-            else:
-                res -= account_balance.quantity
+            bal = account.balance(as_of)
+            res += bal.quantity.cents if bal.d_c == self._nature else -bal.quantity.cents
 
-        return res
+        return Money.from_cents(res)
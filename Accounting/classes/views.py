@@ -0,0 +1,180 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.account import Account
+from Accounting.classes.money import Money
+from Accounting.classes.statement import Statement
+
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+
+
+class SequenceView(Sequence):
+
+    """
+        Read-only view over a list, optionally wrapping every item in its own read-only view.
+
+        Attributes:
+        -----------
+        items : list
+            The list being viewed, it is never copied.
+        wrap : callable
+            Function applied to every item before returning it, None to return the items as they are.
+
+        Methods:
+        --------
+        __init__(items: list, wrap: callable = None):
+            Initializes a new SequenceView instance with the given parameters.
+        __getitem__(index: int | slice):
+            Returns the item at the given index, or a list with the items in the given slice.
+        __len__() -> int:
+            Returns the number of items in the list.
+    """
+
+    __slots__ = ("_items", "_wrap")
+
+    def __init__(self, items: list, wrap=None):
+        self._items = items
+        self._wrap = wrap
+
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, slice):
+            return [self._wrap(item) if self._wrap else item for item in self._items[index]]
+
+        return self._wrap(self._items[index]) if self._wrap else self._items[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        if self._wrap is None:
+            return iter(self._items)
+
+        return (self._wrap(item) for item in self._items)
+
+    def __str__(self) -> str:
+        return "[" + ", ".join(str(item) for item in self) + "]"
+
+
+class AccountView:
+
+    """
+        Read-only view of an Account, the account can be read but no movement can be recorded through it.
+
+        Methods:
+        --------
+        __init__(account: Account):
+            Initializes a new AccountView instance over the given account.
+        __str__() -> str:
+            Returns the string representation of the account.
+        account_id() -> int:
+            Returns the account's account id.
+        name() -> str:
+            Returns the account's name.
+        credits() -> SequenceView:
+            Returns a read-only view of the account's credits.
+        debits() -> SequenceView:
+            Returns a read-only view of the account's debits.
+        balance(as_of: datetime = None) -> AccountMovement:
+            Returns the account's balance, up to the given date if any.
+    """
+
+    __slots__ = ("_account",)
+
+    def __init__(self, account: Account):
+        self._account = account
+
+    def __str__(self) -> str:
+        return str(self._account)
+
+    @property
+    def account_id(self) -> int:
+        return self._account.account_id
+
+    @property
+    def name(self) -> str:
+        return self._account.name
+
+    @property
+    def credits(self) -> SequenceView:
+        return SequenceView(range(self._account.credit_count), self._account.credit_at)
+
+    @property
+    def debits(self) -> SequenceView:
+        return SequenceView(range(self._account.debit_count), self._account.debit_at)
+
+    def balance(self, as_of: datetime = None) -> AccountMovement:
+        return self._account.balance(as_of)
+
+
+class AccountsView(Mapping):
+
+    """
+        Read-only view of a statement's accounts dict, every account is returned as an AccountView.
+
+        Methods:
+        --------
+        __init__(accounts: dict[int, Account]):
+            Initializes a new AccountsView instance over the given dict.
+        __getitem__(account_id: int) -> AccountView:
+            Returns a read-only view of the account with the given id.
+        __len__() -> int:
+            Returns the number of accounts.
+    """
+
+    __slots__ = ("_accounts",)
+
+    def __init__(self, accounts: dict[int, Account]):
+        self._accounts = accounts
+
+    def __getitem__(self, account_id: int) -> AccountView:
+        return AccountView(self._accounts[account_id])
+
+    def __iter__(self):
+        return iter(self._accounts)
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+
+class StatementView:
+
+    """
+        Read-only view of a Statement, the statement can be read but no account or movement can be added through it.
+
+        Methods:
+        --------
+        __init__(statement: Statement):
+            Initializes a new StatementView instance over the given statement.
+        __str__() -> str:
+            Returns the string representation of the statement.
+        name() -> str:
+            Returns the statement's name.
+        nature() -> str:
+            Returns the statement's nature.
+        accounts() -> AccountsView:
+            Returns a read-only view of the statement's accounts.
+        balance(as_of: datetime = None) -> Money:
+            Returns the statement's balance, up to the given date if any.
+    """
+
+    __slots__ = ("_statement",)
+
+    def __init__(self, statement: Statement):
+        self._statement = statement
+
+    def __str__(self) -> str:
+        return str(self._statement)
+
+    @property
+    def name(self) -> str:
+        return self._statement.name
+
+    @property
+    def nature(self) -> str:
+        return self._statement.nature
+
+    @property
+    def accounts(self) -> AccountsView:
+        return AccountsView(self._statement.account_map)
+
+    def balance(self, as_of: datetime = None) -> Money:
+        return self._statement.balance(as_of)
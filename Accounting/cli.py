@@ -0,0 +1,296 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.money import Money
+from Accounting.classes.policy import Policy
+from Accounting.import_policies import import_file
+from Accounting.report import GENERAL_LEDGER_COLUMNS, TRIAL_BALANCE_COLUMNS, write_lines, write_rows
+from Accounting.storage.storage import Storage, open_storage
+
+from Accounting.settings import company_name, database_path, snapshot_interval, storage_backend
+
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+import sys
+
+
+def list_exercises(storage: Storage, args: Namespace) -> None:
+    for entry in storage.catalog():
+        print(entry)
+
+
+def new_exercise(storage: Storage, args: Namespace) -> None:
+    if args.name in [entry.name for entry in storage.catalog()]:
+        raise Exception("ERROR: Exercise '" + args.name + "' already exists.")
+
+    storage.release(storage.new_exercise(company_name, args.name))
+    print(f"Exercise '{args.name}' created.")
+
+
+def add_account(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    exercise.add_account(args.account_id, args.name)
+    storage.add_account(exercise, args.account_id, args.name)
+    storage.release(exercise)
+
+    print(f"Account '{args.account_id}' added to '{exercise.name}'.")
+
+
+def add_group(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    exercise.add_group(args.group_id, args.name)
+    storage.add_group(exercise, args.group_id, args.name)
+    storage.release(exercise)
+
+    print(f"Group '{args.group_id}' added to '{exercise.name}'.")
+
+
+def post_policy(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    amount = Money(args.amount)
+
+    if amount < 0:
+        raise Exception("ERROR: Amount can not be negative.")
+
+    policy = Policy(exercise.next_policy_invoice(), args.description, datetime.fromisoformat(args.date) if args.date else None)
+    policy.debit = AccountMovement(args.debit_account, amount, "d")
+    policy.credit = AccountMovement(args.credit_account, amount, "c")
+
+    exercise.policies = policy
+    storage.add_policy(exercise, policy)
+
+    print(policy)
+
+    if not exercise.check_accounting_equation():
+        print("The accounting equation is unbalanced", file=sys.stderr)
+
+    storage.release(exercise)
+
+
+def post_compound_policy(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    lines = []
+
+    for (account_id, amount), d_c in [(line, "d") for line in args.debit] + [(line, "c") for line in args.credit]:
+        if Money(amount) < 0:
+            raise Exception("ERROR: Amount can not be negative.")
+
+        lines.append(AccountMovement(int(account_id), Money(amount), d_c))
+
+    policy = Policy(
+        exercise.next_policy_invoice(), args.description, datetime.fromisoformat(args.date) if args.date else None,
+        [line for line in lines if line.d_c == "D"], [line for line in lines if line.d_c == "C"]
+    )
+
+    exercise.policies = policy
+    storage.add_policy(exercise, policy)
+
+    print(policy)
+
+    if not exercise.check_accounting_equation():
+        print("The accounting equation is unbalanced", file=sys.stderr)
+
+    storage.release(exercise)
+
+
+def import_policies(storage: Storage, args: Namespace) -> None:
+    import_file(storage, args.exercise, args.file, args.format)
+
+
+def show_exercise(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    write_lines(exercise.iter_report_lines(), args.output)
+    storage.release(exercise)
+
+
+def balance_sheet(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    print(exercise.balance_sheet(datetime.fromisoformat(args.as_of) if args.as_of else None))
+    storage.release(exercise)
+
+
+def detailed_balance_sheet(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    print(exercise.detailed_balance_sheet(args.depth))
+    storage.release(exercise)
+
+
+def income_statement(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    print(exercise.income_statement())
+    storage.release(exercise)
+
+
+def trial_balance(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    write_rows(exercise.trial_balance(), TRIAL_BALANCE_COLUMNS, args.output, args.format or rows_format(args.output))
+    storage.release(exercise)
+
+
+def general_ledger(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    write_rows(exercise.general_ledger(), GENERAL_LEDGER_COLUMNS, args.output, args.format or rows_format(args.output))
+    storage.release(exercise)
+
+
+def rows_format(path: str) -> str:
+    if path is not None and path.lower().endswith(".jsonl"):
+        return "jsonl"
+    elif path is not None and path.lower().endswith(".parquet"):
+        return "parquet"
+
+    return "csv"
+
+
+def reports(storage: Storage, args: Namespace) -> None:
+    # Only this command needs multiprocessing, so the other ones don't pay for importing it
+    from Accounting.batch_reports import consolidate, report_exercises
+
+    # Every worker process opens the storage by itself and reads only the exercise it reports
+    lst = report_exercises(storage_backend, database_path, args.exercises or None, args.workers, datetime.fromisoformat(args.as_of) if args.as_of else None)
+
+    for report in lst:
+        print(report)
+
+    bal_assets, bal_liabilities, bal_common_stock, bal_revenue, bal_expenses = consolidate(lst)
+
+    print(f"Consolidated {len(lst)} exercises:")
+    print(f"    Assets                          {'-' if bal_assets < 0 else ''}${abs(bal_assets)}")
+    print(f"    Liabilities                     {'-' if bal_liabilities < 0 else ''}${abs(bal_liabilities)}")
+    print(f"    Common Stock                    {'-' if bal_common_stock < 0 else ''}${abs(bal_common_stock)}")
+    print(f"    Revenue                         {'-' if bal_revenue < 0 else ''}${abs(bal_revenue)}")
+    print(f"    Expenses                        {'-' if bal_expenses < 0 else ''}${abs(bal_expenses)}")
+
+    if not all(report.balanced for report in lst):
+        print("The accounting equation is unbalanced in: " + ", ".join(report.name for report in lst if not report.balanced), file=sys.stderr)
+
+
+def close_book(storage: Storage, args: Namespace) -> None:
+    exercise = storage.open_exercise(args.exercise)
+    summary = exercise.close_book()
+    storage.snapshot(exercise)
+
+    print(summary)
+    storage.release(exercise)
+
+
+def rollover(storage: Storage, args: Namespace) -> None:
+    if args.name in [entry.name for entry in storage.catalog()]:
+        raise Exception("ERROR: Exercise '" + args.name + "' already exists.")
+
+    exercise = storage.read_exercise(args.exercise)
+    new_exercise = exercise.rollover(args.name)
+    storage.create_exercise(new_exercise)
+    storage.release(new_exercise)
+
+    print(f"Exercise '{args.name}' opened from the closing balances of '{exercise.name}'.")
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(prog="python -m Accounting.cli", description=f"{company_name} accounting, without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("exercises", help="list the exercises")
+    command.set_defaults(run=list_exercises)
+
+    command = commands.add_parser("new-exercise", help="create an exercise")
+    command.add_argument("name")
+    command.set_defaults(run=new_exercise)
+
+    command = commands.add_parser("add-account", help="add an account to an exercise")
+    command.add_argument("exercise")
+    command.add_argument("account_id", type=int)
+    command.add_argument("name")
+    command.set_defaults(run=add_account)
+
+    command = commands.add_parser("add-group", help="name a group (two digits) or subgroup (three digits) of accounts")
+    command.add_argument("exercise")
+    command.add_argument("group_id", type=int)
+    command.add_argument("name")
+    command.set_defaults(run=add_group)
+
+    command = commands.add_parser("post", help="post a policy")
+    command.add_argument("exercise")
+    command.add_argument("description")
+    command.add_argument("debit_account", type=int)
+    command.add_argument("credit_account", type=int)
+    command.add_argument("amount")
+    command.add_argument("--date", help="ISO date of the policy, now by default")
+    command.set_defaults(run=post_policy)
+
+    command = commands.add_parser("post-compound", help="post a policy with several debits and credits")
+    command.add_argument("exercise")
+    command.add_argument("description")
+    command.add_argument("--debit", nargs=2, action="append", required=True, metavar=("ACCOUNT", "AMOUNT"), help="a debit line, repeat it for every debit")
+    command.add_argument("--credit", nargs=2, action="append", required=True, metavar=("ACCOUNT", "AMOUNT"), help="a credit line, repeat it for every credit")
+    command.add_argument("--date", help="ISO date of the policy, now by default")
+    command.set_defaults(run=post_compound_policy)
+
+    command = commands.add_parser("import", help="post the policies of a CSV or JSON Lines file")
+    command.add_argument("exercise")
+    command.add_argument("file")
+    command.add_argument("--format", choices=["csv", "jsonl"], help="file format, guessed from the file extension by default")
+    command.set_defaults(run=import_policies)
+
+    command = commands.add_parser("show", help="print an exercise with all its statements and policies")
+    command.add_argument("exercise")
+    command.add_argument("--output", help="file to write the exercise to, stdout by default")
+    command.set_defaults(run=show_exercise)
+
+    command = commands.add_parser("balance-sheet", help="print the balance sheet of an exercise")
+    command.add_argument("exercise")
+    command.add_argument("--as-of", help="ISO date, only the policies posted up to it are counted")
+    command.set_defaults(run=balance_sheet)
+
+    command = commands.add_parser("chart", help="print the balances of an exercise grouped by statement, group, subgroup and account")
+    command.add_argument("exercise")
+    command.add_argument("--depth", type=int, default=3, help="1 for statements up to 4 for accounts, 3 by default")
+    command.set_defaults(run=detailed_balance_sheet)
+
+    command = commands.add_parser("income-statement", help="print the income statement of an exercise")
+    command.add_argument("exercise")
+    command.set_defaults(run=income_statement)
+
+    command = commands.add_parser("trial-balance", help="write the debits, credits and balance of every account")
+    command.add_argument("exercise")
+    command.add_argument("--output", help="file to write the trial balance to, stdout by default")
+    command.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="file format, guessed from the file extension by default, csv for stdout")
+    command.set_defaults(run=trial_balance)
+
+    command = commands.add_parser("general-ledger", help="write every movement of every account with its running balance")
+    command.add_argument("exercise")
+    command.add_argument("--output", help="file to write the general ledger to, stdout by default")
+    command.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="file format, guessed from the file extension by default, csv for stdout")
+    command.set_defaults(run=general_ledger)
+
+    command = commands.add_parser("reports", help="print the reports of several exercises, computed in parallel")
+    command.add_argument("exercises", nargs="*", help="names of the exercises, all of them by default")
+    command.add_argument("--workers", type=int, help="number of worker processes, one per CPU by default")
+    command.add_argument("--as-of", help="ISO date, only the policies posted up to it are counted in the balances")
+    command.set_defaults(run=reports)
+
+    command = commands.add_parser("close-book", help="close the book of an exercise")
+    command.add_argument("exercise")
+    command.set_defaults(run=close_book)
+
+    command = commands.add_parser("rollover", help="create an exercise from the closing balances of a closed exercise")
+    command.add_argument("exercise")
+    command.add_argument("name")
+    command.set_defaults(run=rollover)
+
+    args = parser.parse_args(argv)
+    storage = open_storage(storage_backend, database_path, snapshot_interval)
+
+    try:
+        args.run(storage, args)
+
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    finally:
+        storage.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,25 @@
 from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.closing_summary import ClosingSummary
 from Accounting.classes.policy import Policy
 from Accounting.classes.exercise import Exercise
+from Accounting.classes.money import Money
+from Accounting.storage.catalog import CatalogEntry
+from Accounting.storage.storage import Storage, open_storage
+from Accounting.instrumentation import count, timed
 
-from Accounting.settings import database_path
+from Accounting.settings import account_search_size, autosave_interval, database_path, report_page_size, snapshot_interval, storage_backend
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, islice
 from tkinter import messagebox
 import customtkinter as ctk
-import pickle
 
 
-def read_file() -> list[Exercise]:
+def read_file(storage: Storage) -> list[CatalogEntry]:
     print("\nOpening database")
     try:
-        with open(database_path + "/database.pickle", "rb") as f:
-            lst = pickle.load(f)
-            print("  lst[Exercise] loaded correctly from database.\n")
+        lst = storage.catalog()
+        print("  lst[CatalogEntry] loaded correctly from database.\n")
     except Exception:
         lst = []
         print("  database couldn't be opened\n")
@@ -22,6 +27,87 @@ def read_file() -> list[Exercise]:
     return lst
 
 
+# === WORKER ===
+
+class Worker:
+
+    """
+        Runs the domain operations of the app on a background thread and hands their results back to the Tk main loop.
+
+        Operations are queued on a single background thread, so writes to an exercise and to the storage never
+        interleave. The main loop polls the queued operations with after() and shows a progress bar while any of
+        them is pending.
+
+        Attributes:
+        -----------
+        poll interval : int
+            Milliseconds between two checks of a pending operation.
+
+        Methods:
+        --------
+        __init__(window: ctk.CTk):
+            Initializes a new Worker instance that shows its progress at the bottom of the given window.
+        submit(widget: ctk.CTkBaseClass, message: str, task: callable, done: callable = None, failed: callable = None) -> None:
+            Runs the task in the background, then calls done with its result, or failed with its exception, from the
+            main loop if the widget still exists. The progress bar isn't shown for tasks without a message.
+        shutdown() -> None:
+            Waits for the queued operations and stops the background thread.
+    """
+
+    poll_interval = 50
+
+    def __init__(self, window: ctk.CTk):
+        self._window = window
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="accounting-worker")
+        self._pending = 0
+
+        self._progress_frame = ctk.CTkFrame(window)
+
+        self._progress_label = ctk.CTkLabel(self._progress_frame, text="", font=ctk.CTkFont(size=15))
+        self._progress_label.grid(row=0, column=0, padx=20, pady=10)
+
+        self._progress_bar = ctk.CTkProgressBar(self._progress_frame, mode="indeterminate", width=300)
+        self._progress_bar.grid(row=0, column=1, padx=20, pady=10)
+
+    def submit(self, widget, message: str, task, done=None, failed=None) -> None:
+        future = self._executor.submit(task)
+
+        # Quick operations, like searches while typing, would only make the progress bar flash
+        if message is not None:
+            self._pending += 1
+            self._progress_label.configure(text=message)
+
+            if self._pending == 1:
+                self._progress_frame.pack(side="bottom", pady=(0, 20))
+                self._progress_bar.start()
+
+        self._window.after(self.poll_interval, self._poll, future, widget, done, failed, message is not None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _poll(self, future: Future, widget, done, failed, shown: bool) -> None:
+        if not future.done():
+            self._window.after(self.poll_interval, self._poll, future, widget, done, failed, shown)
+            return
+
+        if shown:
+            self._pending -= 1
+
+            if self._pending == 0:
+                self._progress_bar.stop()
+                self._progress_frame.pack_forget()
+
+        # The widget that asked for the operation may have been destroyed while it was running
+        if future.exception() is not None:
+            if failed is not None and widget.winfo_exists():
+                failed(future.exception())
+            else:
+                print("\nBackground operation failed: ", future.exception(), "\n")
+        elif done is not None and widget.winfo_exists():
+            done(future.result())
+
+
 # === MAIN CLASS ===
 
 class Accounting(ctk.CTk):
@@ -30,7 +116,9 @@ class Accounting(ctk.CTk):
         super().__init__()
 
         self.company_name = company_name
-        self.exercises = read_file()
+        self.storage = open_storage(storage_backend, database_path, snapshot_interval)
+        self.exercises = read_file(self.storage)
+        self.worker = Worker(self)
 
         self.geometry("1050x750")
         self.title(self.company_name + " Accounting APP")
@@ -41,17 +129,54 @@ class Accounting(ctk.CTk):
         self.title = ctk.CTkLabel(self, text=self.company_name, font=ctk.CTkFont(size=30, weight="bold"))
         self.title.pack(padx=10, pady=(40, 20))
 
-        exercises_frame = Exercises(self, exercises=self.exercises, company_name=self.company_name)
+        exercises_frame = Exercises(self, exercises=self.exercises, company_name=self.company_name, storage=self.storage, worker=self.worker)
         exercises_frame.pack(padx=20, pady=20)
 
-        print("\nAccounting created successfully:")
-        print("  company name: ", self.company_name)
-        print("  exercises: ", self.exercises, "\n")
+        self.closing = False
+        self.autosave_id = None
+
+        if autosave_interval > 0:
+            self.autosave_id = self.after(autosave_interval * 1000, self.autosave)
+
+        count("gui.accounting_created")
+
+    def autosave(self):
+        if self.closing:
+            return
+
+        # The storage only writes what isn't on disk yet, in the background
+        self.worker.submit(self, "Saving...", self.autosave_storage, self.autosaved)
+        self.autosave_id = self.after(autosave_interval * 1000, self.autosave)
+
+    def autosave_storage(self) -> list[str]:
+        # An autosave queued before the window was closed mustn't touch the storage once it's closing
+        if self.closing:
+            return []
+
+        return self.storage.autosave()
+
+    def autosaved(self, names: list[str]):
+        if len(names) > 0:
+            print("\nAutosaved: ", names, "\n")
 
     def save(self):
-        with open(database_path + "/database.pickle", "wb") as f:
-            pickle.dump(self.exercises, f)
-            print("\nDatabase saved successfully\n")
+        # No autosave can run after this, closing the storage is queued after any pending write so nothing is lost
+        self.closing = True
+
+        if self.autosave_id is not None:
+            self.after_cancel(self.autosave_id)
+            self.autosave_id = None
+
+        self.worker.submit(self, "Saving database...", self.storage.close, self.saved, self.save_failed)
+
+    def saved(self, result):
+        self.worker.shutdown()
+        print("\nDatabase saved successfully\n")
+        self.destroy()
+
+    def save_failed(self, e: Exception):
+        messagebox.showerror(title="Save Error", message=str(e))
+        self.worker.shutdown()
         self.destroy()
 
 
@@ -59,11 +184,13 @@ class Accounting(ctk.CTk):
 
 class Exercises(ctk.CTkFrame):
 
-    def __init__(self, *args, exercises: list[Exercise], company_name: str, **kwargs):
+    def __init__(self, *args, exercises: list[CatalogEntry], company_name: str, storage: Storage, worker: Worker, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.exercises = exercises
         self.company_name = company_name
+        self.storage = storage
+        self.worker = worker
         self.window = args[0]
 
         self.header = ctk.CTkLabel(self, text="Exercises", font=ctk.CTkFont(size=25, weight="bold"))
@@ -75,13 +202,18 @@ class Exercises(ctk.CTkFrame):
         self.new_exercise_frame.grid(row=1, column=0, pady=10)
 
         self.new_exercise_header = ctk.CTkLabel(self.new_exercise_frame, text="New Exercise", font=ctk.CTkFont(size=20, weight="bold"))
-        self.new_exercise_header.grid(row=0, column=0, pady=10, columnspan=2)
+        self.new_exercise_header.grid(row=0, column=0, pady=10, columnspan=3)
 
-        self.name_new_exercise_entry = ctk.CTkEntry(self.new_exercise_frame, placeholder_text="Name New Exercise", width=500)
+        self.name_new_exercise_entry = ctk.CTkEntry(self.new_exercise_frame, placeholder_text="Name New Exercise", width=350)
         self.name_new_exercise_entry.grid(row=1, column=0, padx=20, pady=10)
 
+        # A closed exercise to carry the accounts and closing balances from, a blank exercise by default
+        self.rollover_entry = ctk.CTkComboBox(self.new_exercise_frame, values=["Blank"] + [exercise.name for exercise in self.exercises], width=150)
+        self.rollover_entry.set("Blank")
+        self.rollover_entry.grid(row=1, column=1, padx=(0, 20), pady=10)
+
         self.button_new_exercise = ctk.CTkButton(self.new_exercise_frame, text="New Exercise", command=self.show_new_exercise_book)
-        self.button_new_exercise.grid(row=1, column=1, padx=20, pady=10)
+        self.button_new_exercise.grid(row=1, column=2, padx=20, pady=10)
 
         # == Exercises Frame ==
 
@@ -111,15 +243,13 @@ class Exercises(ctk.CTkFrame):
 
                 column += 1
 
-        print("\nExercises created successfully:")
-        print("  company name: ", self.company_name)
-        print("  exercises: ", self.exercises)
-        print("  window: ", self.window)
+        count("gui.exercises_created")
 
-    def show_exercise_book(self, exercise: Exercise):
-        exercise_book_frame = ExerciseBook(self.window, exercise=exercise, exercises=self.exercises, company_name=self.company_name, window=self.window)
-        self.destroy()
-        exercise_book_frame.pack(padx=20, pady=20)
+    def show_exercise_book(self, exercise: CatalogEntry):
+        self.worker.submit(
+            self, f"Opening '{exercise.name}'...", lambda: self.storage.open_exercise(exercise.name), self.open_exercise_book,
+            lambda e: messagebox.showerror(title="Open Exercise Error", message=str(e))
+        )
 
     def show_new_exercise_book(self):
         if self.name_new_exercise_entry.get() == "":
@@ -130,22 +260,43 @@ class Exercises(ctk.CTkFrame):
                     messagebox.showwarning("New Exercise", message="New Exercise's name already exists.")
                     return
 
-            self.exercises.append(Exercise(self.company_name, self.name_new_exercise_entry.get()))
-            exercise_book_frame = ExerciseBook(self.window, exercise=self.exercises[-1], exercises=self.exercises, company_name=self.company_name, window=self.window)
-            self.destroy()
-            exercise_book_frame.pack(padx=20, pady=20)
+            name = self.name_new_exercise_entry.get()
+            previous = self.rollover_entry.get()
+
+            if previous not in [exercise.name for exercise in self.exercises]:
+                self.worker.submit(
+                    self, f"Creating '{name}'...", lambda: self.storage.new_exercise(self.company_name, name), self.open_exercise_book,
+                    lambda e: messagebox.showerror(title="New Exercise Error", message=str(e))
+                )
+                return
+
+            def rollover() -> Exercise:
+                self.storage.create_exercise(self.storage.read_exercise(previous).rollover(name))
+                return self.storage.open_exercise(name)
+
+            self.worker.submit(
+                self, f"Rolling '{previous}' over to '{name}'...", rollover, self.open_exercise_book,
+                lambda e: messagebox.showerror(title="New Exercise Error", message=str(e))
+            )
+
+    def open_exercise_book(self, exercise: Exercise):
+        exercise_book_frame = ExerciseBook(self.window, exercise=exercise, exercises=self.exercises, company_name=self.company_name, storage=self.storage, worker=self.worker, window=self.window)
+        self.destroy()
+        exercise_book_frame.pack(padx=20, pady=20)
 
 
 # === EXERCISE FRAME ===
 
 class ExerciseBook(ctk.CTkFrame):
-    def __init__(self, *args, exercise: Exercise, exercises: list[Exercise], company_name: str, window, **kwargs):
+    def __init__(self, *args, exercise: Exercise, exercises: list[CatalogEntry], company_name: str, storage: Storage, worker: Worker, window, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.actual_frame = None
         self.exercise = exercise
         self.exercises = exercises
         self.company_name = company_name
+        self.storage = storage
+        self.worker = worker
         self.window = window
         self.actual_frame: ctk.CTkFrame
 
@@ -167,14 +318,10 @@ class ExerciseBook(ctk.CTkFrame):
         self.exit_button = ctk.CTkButton(self, text="Exit", command=self.exit)
         self.exit_button.grid(row=1, column=4, padx=10, pady=15)
 
-        print("\nExerciseBook created successfully:")
-        print("  company name: ", self.company_name)
-        print("  exercise: ", self.exercise.name)
-        print("  exercises: ", self.exercises)
-        print("  window: ", self.window, "\n")
+        count("gui.exercise_book_created")
 
     def add_policy(self):
-        add_policy_frame = AddPolicy(self, exercise=self.exercise)
+        add_policy_frame = AddPolicy(self, exercise=self.exercise, storage=self.storage, worker=self.worker)
 
         if self.actual_frame is not None:
             self.actual_frame.destroy()
@@ -183,7 +330,7 @@ class ExerciseBook(ctk.CTkFrame):
         self.actual_frame.grid(row=2, column=0, padx=20, pady=20, columnspan=5)
 
     def add_account(self):
-        add_account_frame = AddAccount(self, exercise=self.exercise)
+        add_account_frame = AddAccount(self, exercise=self.exercise, storage=self.storage, worker=self.worker)
 
         if self.actual_frame is not None:
             self.actual_frame.destroy()
@@ -192,7 +339,7 @@ class ExerciseBook(ctk.CTkFrame):
         self.actual_frame.grid(row=2, column=0, padx=20, pady=20, columnspan=5)
 
     def see_exercise(self):
-        see_exercise_frame = SeeExercise(self, exercise=self.exercise)
+        see_exercise_frame = SeeExercise(self, exercise=self.exercise, worker=self.worker)
 
         if self.actual_frame is not None:
             self.actual_frame.destroy()
@@ -201,7 +348,7 @@ class ExerciseBook(ctk.CTkFrame):
         self.actual_frame.grid(row=2, column=0, padx=20, pady=20, columnspan=5)
 
     def close_book(self):
-        close_book_frame = CloseBook(self, exercise=self.exercise)
+        close_book_frame = CloseBook(self, exercise=self.exercise, storage=self.storage, worker=self.worker)
 
         if self.actual_frame is not None:
             self.actual_frame.destroy()
@@ -210,17 +357,28 @@ class ExerciseBook(ctk.CTkFrame):
         self.actual_frame.grid(row=2, column=0, padx=20, pady=20, columnspan=5)
 
     def exit(self):
-        exercises_frame = Exercises(self.window, exercises=self.exercises, company_name=self.company_name)
+        def release() -> list[CatalogEntry]:
+            self.storage.release(self.exercise)
+            return self.storage.catalog()
+
+        self.worker.submit(self, f"Saving '{self.exercise.name}'...", release, self.show_exercises, lambda e: messagebox.showerror(title="Exit Error", message=str(e)))
+
+    def show_exercises(self, exercises: list[CatalogEntry]):
+        self.exercises = exercises
+
+        exercises_frame = Exercises(self.window, exercises=self.exercises, company_name=self.company_name, storage=self.storage, worker=self.worker)
         self.destroy()
         exercises_frame.pack(padx=20, pady=20)
 
 
 class AddPolicy(ctk.CTkFrame):
 
-    def __init__(self, *args, exercise: Exercise, **kwargs):
+    def __init__(self, *args, exercise: Exercise, storage: Storage, worker: Worker, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.exercise = exercise
+        self.storage = storage
+        self.worker = worker
 
         self.header = ctk.CTkLabel(self, text="Add Policy", font=ctk.CTkFont(size=20, weight="bold"))
         self.header.grid(row=0, column=0, pady=20, columnspan=8)
@@ -246,8 +404,9 @@ class AddPolicy(ctk.CTkFrame):
         self.debit_account_label = ctk.CTkLabel(self, text="Account:", font=ctk.CTkFont(size=15, weight="bold"))
         self.debit_account_label.grid(row=3, column=4, padx=15, pady=15, columnspan=2)
 
-        self.debit_account_entry = ctk.CTkComboBox(self, values=self.exercise.get_all_accounts(), width=125, variable="")
+        self.debit_account_entry = ctk.CTkComboBox(self, values=[], width=125, variable="")
         self.debit_account_entry.grid(row=3, column=6, padx=15, pady=15, columnspan=2)
+        self.debit_account_entry.bind("<KeyRelease>", lambda event: self.search_accounts(self.debit_account_entry))
 
         self.credit_label = ctk.CTkLabel(self, text="Credit:", font=ctk.CTkFont(size=15, weight="bold"))
         self.credit_label.grid(row=4, column=0, padx=15, pady=15, columnspan=2)
@@ -258,14 +417,35 @@ class AddPolicy(ctk.CTkFrame):
         self.credit_account_label = ctk.CTkLabel(self, text="Account:", font=ctk.CTkFont(size=15, weight="bold"))
         self.credit_account_label.grid(row=4, column=4, padx=15, pady=15, columnspan=2)
 
-        self.credit_account_entry = ctk.CTkComboBox(self, values=self.exercise.get_all_accounts(), width=125, variable="")
+        self.credit_account_entry = ctk.CTkComboBox(self, values=[], width=125, variable="")
         self.credit_account_entry.grid(row=4, column=6, padx=15, pady=15, columnspan=2)
+        self.credit_account_entry.bind("<KeyRelease>", lambda event: self.search_accounts(self.credit_account_entry))
 
         self.add_policy_button = ctk.CTkButton(self, text="Add Policy", width=500, command=self.add_policy)
         self.add_policy_button.grid(row=5, column=0, columnspan=8, padx=20, pady=(30, 30))
 
-        print("\nAddPolicy created successfully:")
-        print("  exercise: ", self.exercise.name, "\n")
+        # Only a page of accounts is listed, the index behind it is sorted in the background the first time
+        self.worker.submit(self, "Reading accounts...", lambda: self.exercise.search_accounts("", account_search_size), self.show_accounts)
+
+        count("gui.add_policy_created")
+
+    def show_accounts(self, accounts: list[tuple[int, str]]):
+        values = [f"{account_id} {name}" for account_id, name in accounts]
+
+        self.debit_account_entry.configure(values=values)
+        self.credit_account_entry.configure(values=values)
+
+    def search_accounts(self, combo_box: ctk.CTkComboBox):
+        # Searching runs on the worker, so the index is never built while an account is being added
+        prefix = combo_box.get()
+        self.worker.submit(self, None, lambda: self.exercise.search_accounts(prefix, account_search_size), lambda accounts: self.searched_accounts(combo_box, prefix, accounts))
+
+    def searched_accounts(self, combo_box: ctk.CTkComboBox, prefix: str, accounts: list[tuple[int, str]]):
+        # Every key starts its own search, only the one for the text still in the box is shown
+        if combo_box.get() != prefix:
+            return
+
+        combo_box.configure(values=[f"{account_id} {name}" for account_id, name in accounts])
 
     def add_policy(self):
         try:
@@ -291,51 +471,77 @@ class AddPolicy(ctk.CTkFrame):
                 except Exception:
                     raise Exception("Debit balance entry is not a valid number.")
 
-            if self.credit_account_entry.get() == "":
+            # Accounts picked from the list read "<id> <name>", only the id is posted
+            credit_account = self.credit_account_entry.get().strip().split(" ")[0]
+            debit_account = self.debit_account_entry.get().strip().split(" ")[0]
+
+            if credit_account == "":
                 raise Exception("Credit Account entry is empty.")
-            elif not self.credit_account_entry.get().isnumeric():
+            elif not credit_account.isnumeric():
                 raise Exception("Credit Account entry is not numeric (0-9).")
-            elif len(self.credit_account_entry.get()) != 6:
+            elif len(credit_account) != 6:
                 raise Exception("Credit Account entry must have 6 digits.")
 
-            if self.debit_account_entry.get() == "":
+            if debit_account == "":
                 raise Exception("Debit Account entry is empty.")
-            elif not self.debit_account_entry.get().isnumeric():
+            elif not debit_account.isnumeric():
                 raise Exception("Debit Account entry is not numeric (0-9).")
-            elif len(self.debit_account_entry.get()) != 6:
+            elif len(debit_account) != 6:
                 raise Exception("Debit Account entry must have 6 digits.")
 
-            policy = Policy(self.exercise.next_policy_invoice(), self.description_entry.get())
+            description = self.description_entry.get()
+            credit = AccountMovement(int(credit_account), Money(self.credit_entry.get()), "c")
+            debit = AccountMovement(int(debit_account), Money(self.debit_entry.get()), "d")
 
-            policy.credit = AccountMovement(int(self.credit_account_entry.get()), float(self.credit_entry.get()), "c")
-            policy.debit = AccountMovement(int(self.debit_account_entry.get()), float(self.debit_entry.get()), "d")
+            # The invoice is taken in the background, so policies queued one after another don't get the same one
+            def post() -> tuple[Policy, int, bool]:
+                policy = Policy(self.exercise.next_policy_invoice(), description)
 
-            self.exercise.policies = policy
+                policy.credit = credit
+                policy.debit = debit
 
-            self.invoice.configure(text=self.exercise.next_policy_invoice())
-            self.description_entry.delete("0", "end")
-            self.credit_entry.delete("0", "end")
-            self.debit_entry.delete("0", "end")
-            self.credit_account_entry.set("")
-            self.debit_account_entry.set("")
+                self.exercise.policies = policy
+                self.storage.add_policy(self.exercise, policy)
 
-            messagebox.showinfo(title="Success", message="Policy added successfully.")
-            print("Policy added successfully:\n", policy, "\n")
+                return policy, self.exercise.next_policy_invoice(), self.exercise.check_accounting_equation()
 
-            if not self.exercise.check_accounting_equation():
-                messagebox.showerror(title="Accounting Equation", message="The accounting equation is unbalanced")
-                print("\nThe accounting equation is unbalanced\n")
+            self.add_policy_button.configure(state="disabled")
+            self.worker.submit(self, "Posting policy...", post, self.policy_added, self.policy_failed)
 
         except Exception as e:
             messagebox.showwarning(title="Add Policy Warning", message=str(e))
 
+    def policy_added(self, result: tuple[Policy, int, bool]):
+        policy, next_invoice, balanced = result
+
+        self.add_policy_button.configure(state="normal")
+        self.invoice.configure(text=next_invoice)
+        self.description_entry.delete("0", "end")
+        self.credit_entry.delete("0", "end")
+        self.debit_entry.delete("0", "end")
+        self.credit_account_entry.set("")
+        self.debit_account_entry.set("")
+
+        messagebox.showinfo(title="Success", message="Policy added successfully.")
+        print("Policy added successfully:\n", policy, "\n")
+
+        if not balanced:
+            messagebox.showerror(title="Accounting Equation", message="The accounting equation is unbalanced")
+            print("\nThe accounting equation is unbalanced\n")
+
+    def policy_failed(self, e: Exception):
+        self.add_policy_button.configure(state="normal")
+        messagebox.showwarning(title="Add Policy Warning", message=str(e))
+
 
 class AddAccount(ctk.CTkFrame):
 
-    def __init__(self, *args, exercise: Exercise, **kwargs):
+    def __init__(self, *args, exercise: Exercise, storage: Storage, worker: Worker, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.exercise = exercise
+        self.storage = storage
+        self.worker = worker
 
         self.header = ctk.CTkLabel(self, text="Add Account", font=ctk.CTkFont(size=20, weight="bold"))
         self.header.grid(row=0, column=0, pady=20, columnspan=8)
@@ -355,8 +561,7 @@ class AddAccount(ctk.CTkFrame):
         self.add_account_button = ctk.CTkButton(self, text="Add Account", width=500, command=self.add_account)
         self.add_account_button.grid(row=3, column=0, columnspan=8, padx=20, pady=(30, 30))
 
-        print("\nAddAccount created successfully:")
-        print("  exercise: ", self.exercise.name, "\n")
+        count("gui.add_account_created")
 
     def add_account(self):
         try:
@@ -370,24 +575,41 @@ class AddAccount(ctk.CTkFrame):
             if self.name_entry.get() == "":
                 raise Exception("Name entry is empty.")
 
-            self.exercise.add_account(int(self.account_id_entry.get()), self.name_entry.get())
+            account_id = int(self.account_id_entry.get())
+            name = self.name_entry.get()
+
+            def add() -> str:
+                self.exercise.add_account(account_id, name)
+                self.storage.add_account(self.exercise, account_id, name)
 
-            self.account_id_entry.delete(0, len(self.account_id_entry.get()))
-            self.name_entry.delete(0, len(self.name_entry.get()))
+                return self.exercise.get_all_accounts()[-1]
 
-            messagebox.showinfo(title="Success", message="Account added successfully")
-            print("\nAccount added successfully: ", self.exercise.get_all_accounts()[-1], "\n")
+            self.add_account_button.configure(state="disabled")
+            self.worker.submit(self, "Adding account...", add, self.account_added, self.account_failed)
 
         except Exception as e:
             messagebox.showwarning(title="Add Account Warning", message=str(e))
 
+    def account_added(self, account: str):
+        self.add_account_button.configure(state="normal")
+        self.account_id_entry.delete(0, len(self.account_id_entry.get()))
+        self.name_entry.delete(0, len(self.name_entry.get()))
+
+        messagebox.showinfo(title="Success", message="Account added successfully")
+        print("\nAccount added successfully: ", account, "\n")
+
+    def account_failed(self, e: Exception):
+        self.add_account_button.configure(state="normal")
+        messagebox.showwarning(title="Add Account Warning", message=str(e))
+
 
 class SeeExercise(ctk.CTkFrame):
 
-    def __init__(self, *args, exercise: Exercise, **kwargs):
+    def __init__(self, *args, exercise: Exercise, worker: Worker, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.exercise = exercise
+        self.worker = worker
 
         self.header = ctk.CTkLabel(self, text="See Exercise", font=ctk.CTkFont(size=20, weight="bold"))
         self.header.grid(row=0, column=0, columnspan=3, pady=20)
@@ -402,46 +624,87 @@ class SeeExercise(ctk.CTkFrame):
         self.see_income_button.grid(row=1, column=2, padx=19, pady=10)
 
         self.str_exercise = ctk.CTkTextbox(self, width=600, height=300, font=ctk.CTkFont(size=15))
-        self.str_exercise.grid(row=2, column=0, columnspan=3, pady=20, padx=20)
+        self.str_exercise.grid(row=2, column=0, columnspan=3, pady=(20, 10), padx=20)
 
-        self.str_exercise.insert("0.0", self.exercise)
-        self.str_exercise.configure(state="disabled")
+        self.previous_page_button = ctk.CTkButton(self, text="Previous", command=self.previous_page)
+        self.previous_page_button.grid(row=3, column=0, padx=19, pady=(0, 20))
+
+        self.page_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=15))
+        self.page_label.grid(row=3, column=1, pady=(0, 20))
+
+        self.next_page_button = ctk.CTkButton(self, text="Next", command=self.next_page)
+        self.next_page_button.grid(row=3, column=2, padx=19, pady=(0, 20))
+
+        # Reports are rendered lazily one page at a time, so big exercises don't freeze the window
+        self.report = self.exercise.iter_report_lines
+        self.lines = None
+        self.page = 0
+
+        self.show_page(0)
 
-        print("\nSeeExercise created successfully:")
-        print("  exercise: ", self.exercise.name, "\n")
+        count("gui.see_exercise_created")
 
-        if not self.exercise.check_accounting_equation():
+        self.worker.submit(self, "Checking the accounting equation...", self.exercise.check_accounting_equation, self.equation_checked)
+
+    def equation_checked(self, balanced: bool):
+        if not balanced:
             messagebox.showerror(title="Accounting Equation", message="The accounting equation is unbalanced")
             print("\nThe accounting equation is unbalanced\n")
 
     def see_exercise(self):
-        self.str_exercise.configure(state="normal")
-        self.str_exercise.delete("0.0", "end")
-
-        self.str_exercise.insert("0.0", self.exercise)
-        self.str_exercise.configure(state="disabled")
+        self.report = self.exercise.iter_report_lines
+        self.show_page(0)
 
     def see_balance(self):
-        self.str_exercise.configure(state="normal")
-        self.str_exercise.delete("0.0", "end")
-
-        self.str_exercise.insert("0.0", self.exercise.balance_sheet())
-        self.str_exercise.configure(state="disabled")
+        self.report = lambda: iter(self.exercise.balance_sheet().splitlines())
+        self.show_page(0)
 
     def see_income(self):
+        self.report = lambda: iter(self.exercise.income_statement().splitlines())
+        self.show_page(0)
+
+    def previous_page(self):
+        self.show_page(self.page - 1)
+
+    def next_page(self):
+        self.show_page(self.page + 1)
+
+    @timed("gui.show_page")
+    def show_page(self, page: int):
+        # Going forward keeps reading the same report, going back or switching reports renders it again
+        if self.lines is None or page <= self.page:
+            self.lines = self.report()
+            skipped = page * report_page_size
+        else:
+            skipped = (page - self.page - 1) * report_page_size
+
+        lines = list(islice(self.lines, skipped, skipped + report_page_size))
+        following = next(self.lines, None)
+
+        if following is not None:
+            self.lines = chain([following], self.lines)
+
+        self.page = page
+
         self.str_exercise.configure(state="normal")
         self.str_exercise.delete("0.0", "end")
 
-        self.str_exercise.insert("0.0", self.exercise.income_statement())
+        self.str_exercise.insert("0.0", "\n".join(lines))
         self.str_exercise.configure(state="disabled")
 
+        self.page_label.configure(text=f"Page {page + 1}")
+        self.previous_page_button.configure(state="normal" if page > 0 else "disabled")
+        self.next_page_button.configure(state="normal" if following is not None else "disabled")
+
 
 class CloseBook(ctk.CTkFrame):
 
-    def __init__(self, *args, exercise: Exercise, **kwargs):
+    def __init__(self, *args, exercise: Exercise, storage: Storage, worker: Worker, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.exercise = exercise
+        self.storage = storage
+        self.worker = worker
 
         self.header = ctk.CTkLabel(self, text="Close Book", font=ctk.CTkFont(size=20, weight="bold"), width=500)
         self.header.grid(row=0, column=0, columnspan=2, pady=(20, 30))
@@ -449,15 +712,13 @@ class CloseBook(ctk.CTkFrame):
         self.revenue_label = ctk.CTkLabel(self, text="Revenue:", font=ctk.CTkFont(size=15, weight="bold"))
         self.revenue_label.grid(row=1, column=0)
 
-        revenue_bal = self.exercise.statements[3].balance()
-        self.revenue_balance = ctk.CTkLabel(self, text=f"{'-' if revenue_bal < 0 else ''}${abs(revenue_bal)}", font=ctk.CTkFont(size=15))
+        self.revenue_balance = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=15))
         self.revenue_balance.grid(row=1, column=1)
 
         self.expenses_label = ctk.CTkLabel(self, text="Expenses:", font=ctk.CTkFont(size=15, weight="bold"))
         self.expenses_label.grid(row=2, column=0)
 
-        expenses_bal = self.exercise.statements[4].balance()
-        self.expenses_balance = ctk.CTkLabel(self, text=f"{'-' if expenses_bal < 0 else ''}${abs(expenses_bal)}", font=ctk.CTkFont(size=15))
+        self.expenses_balance = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=15))
         self.expenses_balance.grid(row=2, column=1)
 
         divider_label = ctk.CTkLabel(self, text="_" * 70, anchor="n")
@@ -466,51 +727,55 @@ class CloseBook(ctk.CTkFrame):
         self.operating_income_label = ctk.CTkLabel(self, text="Operating Income:", font=ctk.CTkFont(size=15, weight="bold"))
         self.operating_income_label.grid(row=4, column=0)
 
-        operating_income_bal = revenue_bal - expenses_bal
-        self.operating_income_balance = ctk.CTkLabel(self, text=f"{'-' if operating_income_bal < 0 else ''}${abs(operating_income_bal)}", font=ctk.CTkFont(size=15))
+        self.operating_income_balance = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=15))
         self.operating_income_balance.grid(row=4, column=1)
 
         self.income_tax_label = ctk.CTkLabel(self, text="Income Tax Payable:", font=ctk.CTkFont(size=15, weight="bold"))
         self.income_tax_label.grid(row=5, column=0, pady=30)
 
-        income_tax_bal = 0.3 * operating_income_bal if operating_income_bal > 0 else 0.0
-        self.income_tax_balance = ctk.CTkLabel(self, text=f"${income_tax_bal}", font=ctk.CTkFont(size=15))
+        self.income_tax_balance = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=15))
         self.income_tax_balance.grid(row=5, column=1, pady=30)
 
-        self.net_income_loss = ctk.CTkLabel(self, text="Net Income:" if operating_income_bal >= 0 else "Net Loss:", font=ctk.CTkFont(size=15, weight="bold"))
+        self.net_income_loss = ctk.CTkLabel(self, text="Net Income:", font=ctk.CTkFont(size=15, weight="bold"))
         self.net_income_loss.grid(row=6, column=0, pady=(0, 30))
 
-        self.net_income_loss_balance = ctk.CTkLabel(self, text=f"${abs(operating_income_bal - income_tax_bal)}", font=ctk.CTkFont(size=15))
+        self.net_income_loss_balance = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=15))
         self.net_income_loss_balance.grid(row=6, column=1, pady=(0, 30))
 
         self.close_book_button = ctk.CTkButton(self, text="Close Book", width=400, command=self.close_book)
         self.close_book_button.grid(row=7, column=0, columnspan=2, pady=(15, 20))
 
-        print("\nCloseBook created successfully:")
-        print("  exercise: ", self.exercise.name, "\n")
+        self.worker.submit(self, "Reading balances...", self.exercise.closing_summary, self.show_summary)
 
-    def close_book(self):
-        try:
-            self.exercise.close_book()
+        count("gui.close_book_created")
 
-            revenue_bal = self.exercise.statements[3].balance()
-            self.revenue_balance.configure(text=f"{'-' if revenue_bal < 0 else ''}${abs(revenue_bal)}")
+    def show_summary(self, summary: ClosingSummary):
+        self.revenue_balance.configure(text=f"{'-' if summary.revenue < 0 else ''}${abs(summary.revenue)}")
+        self.expenses_balance.configure(text=f"{'-' if summary.expenses < 0 else ''}${abs(summary.expenses)}")
+        self.operating_income_balance.configure(text=f"{'-' if summary.operating_income < 0 else ''}${abs(summary.operating_income)}")
+        self.income_tax_balance.configure(text=f"${summary.income_tax}")
 
-            expenses_bal = self.exercise.statements[4].balance()
-            self.expenses_balance.configure(text=f"{'-' if expenses_bal < 0 else ''}${abs(expenses_bal)}")
+        self.net_income_loss.configure(text="Net Income:" if summary.net_income >= 0 else "Net Loss:")
 
-            operating_income_bal = revenue_bal - expenses_bal
-            self.operating_income_balance.configure(text=f"{'-' if operating_income_bal < 0 else ''}${abs(operating_income_bal)}")
+        self.net_income_loss_balance.configure(text=f"${abs(summary.net_income)}")
 
-            income_tax_bal = 0.3 * operating_income_bal if operating_income_bal > 0 else 0.0
-            self.income_tax_balance.configure(text=f"${income_tax_bal}")
+    def close_book(self):
+        def close() -> ClosingSummary:
+            summary = self.exercise.close_book()
+            self.storage.snapshot(self.exercise)
 
-            self.net_income_loss.configure(text="Net Income:" if operating_income_bal >= 0 else "Net Loss:")
+            return summary
 
-            self.net_income_loss_balance.configure(text=f"${abs(operating_income_bal - income_tax_bal)}")
+        self.close_book_button.configure(state="disabled")
+        self.worker.submit(self, "Closing book...", close, self.book_closed, self.close_failed)
 
-            messagebox.showinfo(title="Success", message="Book Closed Successfully")
-            print("\nBook Closed Successfully \n")
+    def book_closed(self, summary: ClosingSummary):
+        self.close_book_button.configure(state="normal")
+        self.show_summary(summary)
 
-        except Exception as e:
-            messagebox.showerror(title="Close Book Error", message=str(e))
+        messagebox.showinfo(title="Success", message="Book Closed Successfully")
+        print("\nBook Closed Successfully \n")
+
+    def close_failed(self, e: Exception):
+        self.close_book_button.configure(state="normal")
+        messagebox.showerror(title="Close Book Error", message=str(e))
@@ -0,0 +1,85 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.money import Money
+from Accounting.classes.policy import Policy
+from Accounting.storage.storage import Storage, open_storage
+
+from Accounting.settings import database_path, snapshot_interval, storage_backend
+
+from argparse import ArgumentParser
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+import csv
+import json
+import sys
+
+
+def read_rows(path: str, file_format: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            yield from csv.DictReader(f)
+        elif file_format == "jsonl":
+            for line in f:
+                if line.strip() != "":
+                    yield json.loads(line)
+        else:
+            raise Exception("ERROR: File format '" + file_format + "' isn't a valid option.")
+
+
+def rows_to_policies(rows: Iterable[dict], first_invoice: int) -> Iterator[Policy]:
+    for number, row in enumerate(rows):
+        try:
+            amount = Money(row["amount"])
+
+            if amount < 0:
+                raise Exception("Amount can not be negative.")
+
+            policy = Policy(first_invoice + number, str(row["description"]), datetime.fromisoformat(row["date"]) if row.get("date") else None)
+            policy.debit = AccountMovement(int(row["debit_account"]), amount, "d")
+            policy.credit = AccountMovement(int(row["credit_account"]), amount, "c")
+
+        except Exception as e:
+            raise Exception(f"ERROR: Row {number + 1} isn't valid. {e}")
+
+        yield policy
+
+
+def import_file(storage: Storage, exercise_name: str, path: str, file_format: str = None) -> None:
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+    exercise = storage.open_exercise(exercise_name)
+    policies = exercise.post_many(rows_to_policies(read_rows(path, file_format), exercise.next_policy_invoice()))
+    storage.add_policies(exercise, policies)
+
+    print(f"Imported {len(policies)} policies into '{exercise.name}'.")
+
+    if not exercise.check_accounting_equation():
+        print("The accounting equation is unbalanced", file=sys.stderr)
+
+    storage.release(exercise)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Post a journal of policies from a CSV or JSON Lines file into an exercise.")
+    parser.add_argument("exercise", help="name of the exercise")
+    parser.add_argument("file", help="file with one policy per row: date, description, debit_account, credit_account, amount")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="file format, guessed from the file extension by default")
+    args = parser.parse_args(argv)
+
+    storage = open_storage(storage_backend, database_path, snapshot_interval)
+
+    try:
+        import_file(storage, args.exercise, args.file, args.format)
+
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    finally:
+        storage.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+from Accounting.settings import instrumentation_enabled, instrumentation_trace
+
+from collections.abc import Callable, Iterator
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+
+# The environment variables override settings.py, so a single run can be instrumented without editing it
+enabled = os.environ.get("ACCOUNTING_INSTRUMENTATION", "1" if instrumentation_enabled else "0").lower() not in ("", "0", "false", "no")
+trace_path = os.environ.get("ACCOUNTING_TRACE", instrumentation_trace)
+
+# Spans kept for the trace file, the ones past it are only added to their timer
+MAX_EVENTS = 1000000
+
+_lock = threading.Lock()
+_origin = time.perf_counter_ns()
+_counters: dict[str, int] = {}
+_timers: dict[str, list[int]] = {}
+_events: list[tuple[str, int, int, int]] = []
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    def decorator(function: Callable) -> Callable:
+        # Disabled instrumentation leaves the function as it is, so it costs nothing once imported
+        if not enabled:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name: str, amount: int = 1) -> None:
+    if not enabled:
+        return
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def record(name: str, start: int, duration: int) -> None:
+    with _lock:
+        # calls, total and longest duration in nanoseconds
+        timer = _timers.setdefault(name, [0, 0, 0])
+        timer[0] += 1
+        timer[1] += duration
+        timer[2] = max(timer[2], duration)
+
+        if trace_path and len(_events) < MAX_EVENTS:
+            _events.append((name, start, duration, threading.get_ident()))
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+        _events.clear()
+
+
+def summary_lines() -> Iterator[str]:
+    with _lock:
+        timers = sorted(_timers.items(), key=lambda item: item[1][1], reverse=True)
+        counters = sorted(_counters.items())
+
+    yield f"  {'timer':<32} {'calls':>10} {'total ms':>12} {'mean ms':>12} {'max ms':>12}"
+
+    for name, (calls, total, longest) in timers:
+        yield f"  {name:<32} {calls:>10} {total / 1e6:>12.3f} {total / calls / 1e6:>12.4f} {longest / 1e6:>12.4f}"
+
+    yield f"  {'counter':<32} {'count':>10}"
+
+    for name, value in counters:
+        yield f"  {name:<32} {value:>10}"
+
+
+def write_trace(path: str) -> int:
+    # Chrome trace event format, it opens in chrome://tracing and Perfetto
+    with _lock:
+        events = [
+            {"name": name, "cat": name.split(".")[0], "ph": "X", "ts": (start - _origin) / 1000, "dur": duration / 1000, "pid": os.getpid(), "tid": tid}
+            for name, start, duration, tid in _events
+        ]
+        events.extend({"name": name, "ph": "C", "ts": (time.perf_counter_ns() - _origin) / 1000, "pid": os.getpid(), "args": {"count": value}} for name, value in _counters.items())
+
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    os.replace(tmp_path, path)
+
+    return len(events)
+
+
+def _report() -> None:
+    print("\nInstrumentation summary:", file=sys.stderr)
+
+    for line in summary_lines():
+        print(line, file=sys.stderr)
+
+    if trace_path:
+        write_trace(trace_path)
+        print(f"  trace written to {trace_path}", file=sys.stderr)
+
+
+if enabled:
+    atexit.register(_report)
@@ -0,0 +1,139 @@
+from Accounting.classes.money import Money
+from Accounting.instrumentation import timed
+
+from collections.abc import Iterable
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+import csv
+import importlib.util
+import json
+import os
+import sys
+
+
+# columns of the rows yielded by Exercise.trial_balance and Exercise.general_ledger
+TRIAL_BALANCE_COLUMNS = ["account_id", "name", "debits", "credits", "balance"]
+GENERAL_LEDGER_COLUMNS = ["account_id", "account", "date", "invoice", "description", "debit", "credit", "balance"]
+
+# rows held in memory at once while a Parquet file is written, one row group each
+PARQUET_BATCH_SIZE = 65536
+
+
+@timed("report.write_lines")
+def write_lines(lines: Iterable[str], path: str = None) -> int:
+    # Lines are written as they are produced, so a whole journal can be written without building it in memory
+    if path is None:
+        return _write(lines, sys.stdout)
+
+    # A file is written next to its destination and moved over it once complete
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        count = _write(lines, f)
+
+    os.replace(tmp_path, path)
+
+    return count
+
+
+@timed("report.write_rows")
+def write_rows(rows: Iterable[tuple], columns: list[str], path: str = None, file_format: str = "csv") -> int:
+    # Rows are streamed like lines, only Parquet keeps a batch of them to write each row group
+    if file_format not in ("csv", "jsonl", "parquet"):
+        raise Exception("ERROR: File format '" + file_format + "' isn't a valid option.")
+
+    if file_format == "parquet":
+        # pyarrow is slow to import, so it's only looked up here and imported by the Parquet writer
+        if importlib.util.find_spec("pyarrow") is None:
+            raise Exception("ERROR: Parquet files need pyarrow, which isn't installed.")
+
+        if path is None:
+            raise Exception("ERROR: Parquet files can't be written to stdout.")
+
+    if path is None:
+        return _write_rows(rows, columns, sys.stdout, file_format)
+
+    tmp_path = path + ".tmp"
+
+    if file_format == "parquet":
+        count = _write_parquet(rows, columns, tmp_path)
+    else:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            count = _write_rows(rows, columns, f, file_format)
+
+    os.replace(tmp_path, path)
+
+    return count
+
+
+def _write(lines: Iterable[str], f) -> int:
+    count = 0
+
+    for line in lines:
+        f.write(line)
+        f.write("\n")
+        count += 1
+
+    return count
+
+
+def _write_rows(rows: Iterable[tuple], columns: list[str], f, file_format: str) -> int:
+    count = 0
+
+    if file_format == "csv":
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+
+        for row in rows:
+            writer.writerow([_text(value) if isinstance(value, (Money, datetime)) else value for value in row])
+            count += 1
+    else:
+        for row in rows:
+            f.write(json.dumps({column: _text(value) if isinstance(value, (Money, datetime)) else value for column, value in zip(columns, row)}, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+
+    return count
+
+
+def _write_parquet(rows: Iterable[tuple], columns: list[str], path: str) -> int:
+    # Money is written as an exact decimal, wide enough for any batch, with the schema of the first batch
+    import pyarrow
+    import pyarrow.parquet
+
+    rows = iter(rows)
+    count = 0
+    writer = None
+
+    try:
+        while batch := list(islice(rows, PARQUET_BATCH_SIZE)):
+            table = pyarrow.Table.from_pydict({
+                column: [Decimal(str(value)) if isinstance(value, Money) else value for value in values]
+                for column, values in zip(columns, zip(*batch))
+            })
+
+            if writer is None:
+                schema = pyarrow.schema([
+                    pyarrow.field(field.name, pyarrow.decimal128(38, field.type.scale)) if pyarrow.types.is_decimal(field.type) else field
+                    for field in table.schema
+                ])
+                writer = pyarrow.parquet.ParquetWriter(path, schema)
+
+            writer.write_table(table.cast(writer.schema))
+            count += len(batch)
+
+        if writer is None:
+            pyarrow.parquet.write_table(pyarrow.Table.from_pydict({column: [] for column in columns}), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return count
+
+
+def _text(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    return str(value)
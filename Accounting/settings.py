@@ -4,3 +4,26 @@ database_path = "database"
 
 # company's name
 company_name = "Instituto Tecnológico Autónomo de México"
+
+# number of journal records an exercise can accumulate before its snapshot is rewritten, a batch counts one per policy
+snapshot_interval = 500
+
+# storage backend, "journal" (snapshots plus append-only journals) or "sqlite"
+storage_backend = "journal"
+
+# seconds between two autosaves of the exercises modified in the GUI, 0 to only save on exit
+autosave_interval = 60
+
+# number of lines of a report shown at once in the See Exercise page
+report_page_size = 200
+
+# collect counters and timers of posting, balances, reports, loading and saving, printed on exit
+# ACCOUNTING_INSTRUMENTATION=1 enables it without editing this file
+instrumentation_enabled = False
+
+# Chrome trace file written on exit when instrumentation is enabled, empty to only print the summary
+# ACCOUNTING_TRACE=<path> sets it without editing this file
+instrumentation_trace = ""
+
+# number of accounts listed in the account boxes of the Add Policy page while typing
+account_search_size = 20
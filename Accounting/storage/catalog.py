@@ -0,0 +1,75 @@
+from datetime import datetime
+
+
+class CatalogEntry:
+
+    """
+        Lightweight description of a stored exercise, enough to list it without loading its contents.
+
+        Attributes:
+        -----------
+        company name : str
+            The name of the company.
+        name : str
+            The name of the exercise.
+        exercise : datetime
+            The date and time the exercise was created.
+        policies : int
+            The number of policies recorded in the exercise.
+
+        Methods:
+        --------
+        __init__(company_name: str, name: str, exercise: datetime, policies: int):
+            Initializes a new CatalogEntry instance with the given parameters.
+        __str__() -> str:
+            Returns a string representation of the catalog entry instance.
+        company_name() -> str:
+            Returns the company name attribute.
+        name() -> str:
+            Returns the name attribute.
+        exercise() -> datetime:
+            Returns the exercise attribute.
+        policies() -> int:
+            Returns the policies attribute.
+    """
+
+    def __init__(self, company_name: str, name: str, exercise: datetime, policies: int):
+        self._company_name = company_name
+        self._name = name
+        self._exercise = exercise
+        self._policies = policies
+
+    def __str__(self) -> str:
+        return f"Exercise: {self._name}, Year: {self._exercise.strftime('%Y')}, Policies: {self._policies}"
+
+    @property
+    def company_name(self) -> str:
+        return self._company_name
+
+    @company_name.setter
+    def company_name(self, company_name: str) -> None:
+        pass
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        pass
+
+    @property
+    def exercise(self) -> datetime:
+        return self._exercise
+
+    @exercise.setter
+    def exercise(self, exercise: datetime) -> None:
+        pass
+
+    @property
+    def policies(self) -> int:
+        return self._policies
+
+    @policies.setter
+    def policies(self, policies: int) -> None:
+        pass
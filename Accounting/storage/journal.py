@@ -0,0 +1,342 @@
+from Accounting.classes.exercise import Exercise
+from Accounting.classes.policy import Policy
+from Accounting.instrumentation import timed
+from Accounting.storage.catalog import CatalogEntry
+
+from hashlib import sha1
+import os
+import pickle
+
+
+def _record_size(kind: str, payload) -> int:
+    # A batch of policies costs as much to replay as the same policies posted one by one
+    return len(payload) if kind == "policies" else 1
+
+
+class Journal:
+
+    """
+        Append-only persistence for exercises.
+
+        Every exercise is stored in two files inside the database directory: a snapshot with the whole pickled
+        exercise and a journal where each posted policy and each added account is appended as a single record.
+        Opening an exercise replays the journal on top of the snapshot, and once an exercise has accumulated
+        enough records the snapshot is rewritten and its journal truncated.
+
+        A small catalog file lists every exercise, so the exercises can be listed without loading any of them.
+
+        Attributes:
+        -----------
+        path : str
+            The database directory.
+        snapshot interval : int
+            Number of journal records an exercise can accumulate before its snapshot is compacted, a batch of
+            policies counts as one record per policy.
+
+        Methods:
+        --------
+        __init__(path: str, snapshot_interval: int):
+            Initializes a new Journal instance with the given parameters.
+        catalog() -> list[CatalogEntry]:
+            Returns the catalog entries of all the exercises, oldest first.
+            Imports the legacy 'database.pickle' file if no snapshot exists yet.
+        open_exercise(name: str) -> Exercise:
+            Rebuilds the exercise from its snapshot and journal.
+            Raises exception if the exercise doesn't exist.
+        read_exercise(name: str) -> Exercise:
+            Rebuilds the exercise like open_exercise but without writing anything, several processes can read
+            the same journal at once. The exercise can't be modified through the journal.
+            Raises exception if the exercise doesn't exist.
+        release(exercise: Exercise) -> None:
+            Updates the exercise's catalog entry and closes its journal, the exercise must be opened again to be modified.
+        new_exercise(company_name: str, name: str) -> Exercise:
+            Creates a new empty exercise, writes its first snapshot and adds it to the catalog.
+        create_exercise(exercise: Exercise) -> None:
+            Writes the first snapshot of a new exercise.
+            Raises exception if the exercise's name already exists in the journal.
+        add_account(exercise: Exercise, account_id: int, name: str) -> None:
+            Appends an account record to the exercise's journal.
+            Raises exception if the exercise doesn't exist in the journal.
+        add_group(exercise: Exercise, group_id: int, name: str) -> None:
+            Appends a group record to the exercise's journal.
+            Raises exception if the exercise doesn't exist in the journal.
+        add_policy(exercise: Exercise, policy: Policy) -> None:
+            Appends a policy record to the exercise's journal.
+            Raises exception if the exercise doesn't exist in the journal.
+        add_policies(exercise: Exercise, policies: list[Policy]) -> None:
+            Appends a single record with a batch of policies posted with post_many to the exercise's journal.
+            Raises exception if the exercise doesn't exist in the journal.
+        snapshot(exercise: Exercise) -> None:
+            Writes the whole exercise to its snapshot, truncates its journal and marks the exercise as saved.
+        autosave() -> list[str]:
+            Syncs the open journals to disk and updates the catalog entries of the opened exercises. Only the
+            exercises with changes that never reached the journal get a new snapshot.
+            Returns the names of the snapshotted exercises.
+        close() -> None:
+            Releases all the opened exercises and closes all the open journal files.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int = 500):
+        self._path = path
+        self._snapshot_interval = snapshot_interval
+        self._sequences: dict[str, int] = {}
+        self._pending: dict[str, int] = {}
+        self._versions: dict[str, int] = {}
+        self._files = {}
+        self._catalog: dict[str, CatalogEntry] = None
+        self._opened: dict[str, Exercise] = {}
+
+        os.makedirs(os.path.join(self._path, "exercises"), exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, path: str) -> None:
+        pass
+
+    @property
+    def snapshot_interval(self) -> int:
+        return self._snapshot_interval
+
+    @snapshot_interval.setter
+    def snapshot_interval(self, snapshot_interval: int) -> None:
+        pass
+
+    def catalog(self) -> list[CatalogEntry]:
+        if self._catalog is None:
+            self._read_catalog()
+
+        return sorted(self._catalog.values(), key=lambda entry: entry.exercise)
+
+    def open_exercise(self, name: str) -> Exercise:
+        if not os.path.exists(self._file_path(name) + ".snapshot"):
+            raise Exception("ERROR: Exercise '" + name + "' doesn't exist in the journal.")
+
+        exercise = self._load_exercise(self._file_path(name))
+        self._opened[exercise.name] = exercise
+
+        return exercise
+
+    def read_exercise(self, name: str) -> Exercise:
+        if not os.path.exists(self._file_path(name) + ".snapshot"):
+            raise Exception("ERROR: Exercise '" + name + "' doesn't exist in the journal.")
+
+        return self._load_exercise(self._file_path(name), read_only=True)
+
+    def release(self, exercise: Exercise) -> None:
+        self._update_catalog(exercise)
+        self._opened.pop(exercise.name, None)
+
+        if exercise.name in self._files:
+            self._files.pop(exercise.name).close()
+
+        self._sequences.pop(exercise.name, None)
+        self._pending.pop(exercise.name, None)
+        self._versions.pop(exercise.name, None)
+
+    def new_exercise(self, company_name: str, name: str) -> Exercise:
+        exercise = Exercise(company_name, name)
+        self.create_exercise(exercise)
+
+        return exercise
+
+    def create_exercise(self, exercise: Exercise) -> None:
+        if self._catalog is None:
+            self._read_catalog()
+
+        if exercise.name in self._catalog:
+            raise Exception("ERROR: Exercise '" + exercise.name + "' already exists in the journal.")
+
+        self.snapshot(exercise)
+        self._update_catalog(exercise)
+        self._opened[exercise.name] = exercise
+
+    def add_account(self, exercise: Exercise, account_id: int, name: str) -> None:
+        self._append(exercise, "account", (account_id, name))
+
+    def add_group(self, exercise: Exercise, group_id: int, name: str) -> None:
+        self._append(exercise, "group", (group_id, name))
+
+    def add_policy(self, exercise: Exercise, policy: Policy) -> None:
+        self._append(exercise, "policy", policy)
+
+    def add_policies(self, exercise: Exercise, policies: list[Policy]) -> None:
+        self._append(exercise, "policies", policies)
+
+    @timed("journal.snapshot")
+    def snapshot(self, exercise: Exercise) -> None:
+        file_path = self._file_path(exercise.name)
+        sequence = self._sequences.get(exercise.name, 0)
+
+        with open(file_path + ".snapshot.tmp", "wb") as f:
+            pickle.dump((sequence, exercise), f, pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(file_path + ".snapshot.tmp", file_path + ".snapshot")
+
+        # Records up to 'sequence' are already in the snapshot, so the journal can start over
+        if exercise.name in self._files:
+            self._files.pop(exercise.name).close()
+
+        open(file_path + ".journal", "wb").close()
+
+        self._sequences[exercise.name] = sequence
+        self._pending[exercise.name] = 0
+        self._versions[exercise.name] = exercise.version
+
+        exercise.mark_saved()
+
+    @timed("journal.autosave")
+    def autosave(self) -> list[str]:
+        # Changes already in a journal only need to reach the disk, a snapshot is only worth it for the rest
+        for f in self._files.values():
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._catalog is None:
+            self._read_catalog()
+
+        saved = []
+        changed = False
+
+        for exercise in list(self._opened.values()):
+            if exercise.dirty:
+                self.snapshot(exercise)
+                saved.append(exercise.name)
+
+            entry = self._catalog.get(exercise.name)
+
+            if entry is None or entry.policies != exercise.next_policy_invoice() - 1:
+                self._catalog[exercise.name] = CatalogEntry(exercise.company_name, exercise.name, exercise.exercise, exercise.next_policy_invoice() - 1)
+                changed = True
+
+        if changed:
+            self._write_catalog()
+
+        return saved
+
+    def close(self) -> None:
+        for exercise in list(self._opened.values()):
+            self.release(exercise)
+
+        for f in self._files.values():
+            f.close()
+
+        self._files.clear()
+
+    def _read_catalog(self) -> None:
+        try:
+            with open(os.path.join(self._path, "catalog.pickle"), "rb") as f:
+                self._catalog = pickle.load(f)
+
+            return
+        except FileNotFoundError:
+            self._catalog = {}
+
+        # Databases written before the catalog existed are indexed once from their snapshots
+        directory = os.path.join(self._path, "exercises")
+
+        for file_name in os.listdir(directory):
+            if file_name.endswith(".snapshot"):
+                self.release(self._load_exercise(os.path.join(directory, file_name[:-len(".snapshot")])))
+
+        if len(self._catalog) == 0 and os.path.exists(os.path.join(self._path, "database.pickle")):
+            with open(os.path.join(self._path, "database.pickle"), "rb") as f:
+                for exercise in pickle.load(f):
+                    self.create_exercise(exercise)
+                    self.release(exercise)
+
+        self._write_catalog()
+
+    def _update_catalog(self, exercise: Exercise) -> None:
+        if self._catalog is None:
+            self._read_catalog()
+
+        self._catalog[exercise.name] = CatalogEntry(exercise.company_name, exercise.name, exercise.exercise, exercise.next_policy_invoice() - 1)
+        self._write_catalog()
+
+    def _write_catalog(self) -> None:
+        file_path = os.path.join(self._path, "catalog.pickle")
+
+        with open(file_path + ".tmp", "wb") as f:
+            pickle.dump(self._catalog, f, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(file_path + ".tmp", file_path)
+
+    def _file_path(self, name: str) -> str:
+        return os.path.join(self._path, "exercises", sha1(name.encode("utf-8")).hexdigest())
+
+    @timed("journal.append")
+    def _append(self, exercise: Exercise, kind: str, payload) -> None:
+        if exercise.name not in self._sequences:
+            raise Exception("ERROR: Exercise '" + exercise.name + "' doesn't exist in the journal.")
+
+        if exercise.name not in self._files:
+            self._files[exercise.name] = open(self._file_path(exercise.name) + ".journal", "ab")
+
+        self._sequences[exercise.name] += 1
+        self._pending[exercise.name] += _record_size(kind, payload)
+
+        f = self._files[exercise.name]
+        pickle.dump((self._sequences[exercise.name], kind, payload), f, pickle.HIGHEST_PROTOCOL)
+        f.flush()
+
+        # The record holds the exercise's last changes only if nothing else changed it since the last record
+        if self._versions.get(exercise.name) == exercise.version - _record_size(kind, payload):
+            self._versions[exercise.name] = exercise.version
+            exercise.mark_saved()
+
+        if self._pending[exercise.name] >= self._snapshot_interval:
+            self.snapshot(exercise)
+
+    @timed("journal.load")
+    def _load_exercise(self, file_path: str, read_only: bool = False) -> Exercise:
+        with open(file_path + ".snapshot", "rb") as f:
+            sequence, exercise = pickle.load(f)
+
+        pending = 0
+
+        if os.path.exists(file_path + ".journal"):
+            with open(file_path + ".journal", "rb" if read_only else "r+b") as f:
+                valid_offset = 0
+
+                while True:
+                    try:
+                        record_sequence, kind, payload = pickle.load(f)
+                    except Exception:
+                        # End of the journal, or a record cut short by a crash
+                        break
+
+                    valid_offset = f.tell()
+
+                    # A crash between a snapshot and its journal truncation leaves records already applied
+                    if record_sequence <= sequence:
+                        continue
+
+                    if kind == "account":
+                        exercise.add_account(*payload)
+                    elif kind == "group":
+                        exercise.add_group(*payload)
+                    elif kind == "policy":
+                        exercise.policies = payload
+                    elif kind == "policies":
+                        exercise.post_many(payload)
+                    else:
+                        raise Exception("ERROR: Journal record type '" + kind + "' isn't a valid type.")
+
+                    sequence = record_sequence
+                    pending += _record_size(kind, payload)
+
+                if not read_only:
+                    f.truncate(valid_offset)
+
+        if not read_only:
+            self._sequences[exercise.name] = sequence
+            self._pending[exercise.name] = pending
+            self._versions[exercise.name] = exercise.version
+            exercise.mark_saved()
+
+        return exercise
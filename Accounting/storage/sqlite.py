@@ -0,0 +1,564 @@
+from Accounting.classes.account_movement import AccountMovement
+from Accounting.classes.chart import ChartOfAccounts
+from Accounting.classes.exercise import Exercise, REPORT_CACHE_SIZE, STATEMENTS
+from Accounting.classes.report_cache import ReportCache
+from Accounting.classes.money import Money
+from Accounting.classes.policy import Policy
+from Accounting.classes.statement import Statement
+from Accounting.classes.views import SequenceView
+from Accounting.instrumentation import count, timed
+from Accounting.storage.catalog import CatalogEntry
+
+from collections.abc import Iterable, Iterator
+from itertools import groupby
+from datetime import datetime
+import os
+import pickle
+import sqlite3
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS exercises (
+        id INTEGER PRIMARY KEY,
+        company_name TEXT NOT NULL,
+        name TEXT NOT NULL UNIQUE,
+        created TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS accounts (
+        exercise INTEGER NOT NULL REFERENCES exercises (id),
+        account_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (exercise, account_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS groups (
+        exercise INTEGER NOT NULL REFERENCES exercises (id),
+        group_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (exercise, group_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS policies (
+        exercise INTEGER NOT NULL REFERENCES exercises (id),
+        invoice INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        date TEXT NOT NULL,
+        PRIMARY KEY (exercise, invoice)
+    );
+
+    CREATE TABLE IF NOT EXISTS movements (
+        exercise INTEGER NOT NULL REFERENCES exercises (id),
+        invoice INTEGER NOT NULL,
+        account_id INTEGER NOT NULL,
+        cents INTEGER NOT NULL,
+        d_c TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS policies_date ON policies (exercise, date);
+    CREATE INDEX IF NOT EXISTS movements_account ON movements (exercise, account_id);
+    CREATE INDEX IF NOT EXISTS movements_invoice ON movements (exercise, invoice);
+"""
+
+# invoices looked up by a single query while a batch is validated, below SQLite's limit of parameters
+INVOICES_PER_QUERY = 500
+
+
+class SQLiteExercise(Exercise):
+
+    """
+        Exercise whose accounts, policies and movements live in a SQLite database instead of in memory.
+
+        Balances, listings and reports are answered with SQL aggregates; the statements and policies are only
+        materialized when they are explicitly requested.
+        Reports are cached like in memory, so changes made to the exercise through another SQLiteExercise aren't
+        seen until it's opened again.
+
+        Attributes:
+        -----------
+        connection : sqlite3.Connection
+            The connection to the ledger database.
+        exercise id : int
+            The exercise's row id in the database.
+
+        Methods:
+        --------
+        __init__(connection: sqlite3.Connection, exercise_id: int, company_name: str, name: str, exercise: datetime):
+            Initializes a new SQLiteExercise instance over an existing exercise row.
+        materialize() -> Exercise:
+            Returns an in-memory Exercise with all the accounts and policies of the exercise.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, exercise_id: int, company_name: str, name: str, exercise: datetime):
+        self._connection = connection
+        self._exercise_id = exercise_id
+        self._company_name = company_name
+        self._name = name
+        self._exercise = exercise
+        self._dirty = False
+        self._version = 0
+        self._cache = ReportCache(REPORT_CACHE_SIZE)
+        self._account_index = None
+
+    @property
+    def exercise_id(self) -> int:
+        return self._exercise_id
+
+    @exercise_id.setter
+    def exercise_id(self, exercise_id: int) -> None:
+        pass
+
+    @property
+    def statements(self) -> SequenceView:
+        return self.materialize().statements
+
+    @statements.setter
+    def statements(self, statements: list[Statement]) -> None:
+        pass
+
+    @property
+    def policies(self) -> SequenceView:
+        return self.materialize().policies
+
+    @policies.setter
+    @timed("exercise.post")
+    def policies(self, policy: Policy) -> None:
+        self.post_many([policy])
+
+    @timed("exercise.post_many")
+    def post_many(self, policies: Iterable[Policy]) -> list[Policy]:
+        lst = list(policies)
+        invoices = set()
+
+        # The accounts and the invoices already posted are read once for the whole batch, not once per movement
+        accounts = {account_id for account_id, in self._connection.execute("SELECT account_id FROM accounts WHERE exercise = ?", (self._exercise_id,))}
+        posted = self._posted_invoices([policy.invoice for policy in lst])
+
+        for number, policy in enumerate(lst):
+            try:
+                self._validate_policy(policy, accounts)
+
+                if policy.invoice in posted or policy.invoice in invoices:
+                    raise Exception("ERROR: Policy invoice '" + str(policy.invoice) + "' already exists.")
+            except Exception as e:
+                raise Exception(f"ERROR: Policy {number + 1} of the batch isn't valid. {e}")
+
+            invoices.add(policy.invoice)
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO policies VALUES (?, ?, ?, ?)",
+                [(self._exercise_id, policy.invoice, policy.description, policy.date.isoformat()) for policy in lst]
+            )
+            self._connection.executemany(
+                "INSERT INTO movements VALUES (?, ?, ?, ?, ?)",
+                [(self._exercise_id, policy.invoice, movement.account_id, movement.quantity.cents, movement.d_c) for policy in lst for movement in (*policy.credits, *policy.debits)]
+            )
+
+        count("exercise.policies_posted", len(lst))
+        self._version += 1
+
+        return lst
+
+    def add_account(self, account_id: int, name: str) -> None:
+        if account_id // 100000 < 1 or account_id // 100000 > 5:
+            raise Exception("ERROR: Account ID '" + str(account_id) + "' doesn't belong to any any statement")
+
+        try:
+            with self._connection:
+                self._connection.execute("INSERT INTO accounts VALUES (?, ?, ?)", (self._exercise_id, account_id, name))
+        except sqlite3.IntegrityError:
+            raise Exception("ERROR: Account ID already exists.")
+
+        self._account_index = None
+        self._version += 1
+
+    def add_group(self, group_id: int, name: str) -> None:
+        if len(str(group_id)) not in (2, 3) or group_id // 10 ** (len(str(group_id)) - 1) < 1 or group_id // 10 ** (len(str(group_id)) - 1) > 5:
+            raise Exception("ERROR: Group ID '" + str(group_id) + "' doesn't belong to any statement.")
+
+        # Adding a group again renames it, like in memory
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO groups VALUES (?, ?, ?)", (self._exercise_id, group_id, name))
+
+        self._version += 1
+
+    def next_policy_invoice(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM policies WHERE exercise = ?", (self._exercise_id,)).fetchone()[0] + 1
+
+    def get_all_accounts(self) -> list[str]:
+        rows = self._connection.execute("SELECT account_id FROM accounts WHERE exercise = ? ORDER BY account_id / 100000, rowid", (self._exercise_id,))
+
+        return [str(account_id) for account_id, in rows]
+
+    @timed("sqlite.materialize")
+    def materialize(self) -> Exercise:
+        exercise = Exercise(self._company_name, self._name)
+        exercise._exercise = self._exercise
+
+        for group_id, name in self._connection.execute("SELECT group_id, name FROM groups WHERE exercise = ?", (self._exercise_id,)):
+            exercise.add_group(group_id, name)
+
+        for account_id, name in self._connection.execute("SELECT account_id, name FROM accounts WHERE exercise = ? ORDER BY rowid", (self._exercise_id,)):
+            exercise.add_account(account_id, name)
+
+        exercise.post_many(self._select_policies("1", (), "invoice"))
+
+        return exercise
+
+    def policy(self, invoice: int) -> Policy:
+        policies = self._select_policies("invoice = ?", (invoice,), "invoice")
+
+        if len(policies) == 0:
+            raise Exception("ERROR: Policy invoice '" + str(invoice) + "' doesn't exist.")
+
+        return policies[0]
+
+    def policies_between(self, start: datetime, end: datetime) -> list[Policy]:
+        return self._select_policies("date >= ? AND date < ?", (start.isoformat(), end.isoformat()), "date, invoice")
+
+    def postings_for(self, account_id: int) -> list[Policy]:
+        if self._connection.execute("SELECT 1 FROM accounts WHERE exercise = ? AND account_id = ?", (self._exercise_id, account_id)).fetchone() is None:
+            raise Exception("ERROR: Account '" + str(account_id) + "' doesn't exist.")
+
+        return self._select_policies("invoice IN (SELECT invoice FROM movements WHERE exercise = ? AND account_id = ?)", (self._exercise_id, account_id), "invoice")
+
+    def _select_policies(self, condition: str, parameters: tuple, order: str) -> list[Policy]:
+        headers = {}
+        movements = {}
+        rows = self._connection.execute(
+            f"SELECT invoice, description, date FROM policies WHERE exercise = ? AND {condition} ORDER BY {order}",
+            (self._exercise_id, *parameters)
+        )
+
+        for invoice, description, date in rows:
+            headers[invoice] = (description, datetime.fromisoformat(date))
+            movements[invoice] = ([], [])
+
+        rows = self._connection.execute(
+            f"SELECT invoice, account_id, cents, d_c FROM movements WHERE exercise = ? AND invoice IN (SELECT invoice FROM policies WHERE exercise = ? AND {condition}) ORDER BY rowid",
+            (self._exercise_id, self._exercise_id, *parameters)
+        )
+
+        for invoice, account_id, cents, d_c in rows:
+            movements[invoice][0 if d_c == "D" else 1].append(AccountMovement(account_id, Money.from_cents(cents), d_c))
+
+        return [Policy(invoice, description, date, *movements[invoice]) for invoice, (description, date) in headers.items()]
+
+    def _validate_policy(self, policy: Policy, accounts: set[int]) -> None:
+        # The invoice is checked by post_many, against all the invoices of the batch at once
+        if policy.credit is None or policy.debit is None:
+            raise Exception("ERROR: Policy must have a credit and a debit.")
+
+        if not policy.balanced():
+            raise Exception("ERROR: Credit and debit is not balanced.")
+
+        for account_movement in (*policy.credits, *policy.debits):
+            if account_movement.account_id // 100000 < 1 or account_movement.account_id // 100000 > 5:
+                raise Exception("ERROR: Account ID '" + str(account_movement.account_id) + "' doesn't belong to any any statement")
+
+            if account_movement.d_c not in ("D", "C"):
+                raise Exception("ERROR: Account Movement d_c's '" + account_movement.d_c + "' isn't a valid type.")
+
+            if account_movement.account_id not in accounts:
+                raise Exception("ERROR: Account '" + str(account_movement.account_id) + "' doesn't exist.")
+
+    def _posted_invoices(self, invoices: list[int]) -> set[int]:
+        res = set()
+
+        # SQLite limits the number of parameters of a query, so the invoices are looked up in chunks
+        for start in range(0, len(invoices), INVOICES_PER_QUERY):
+            chunk = invoices[start:start + INVOICES_PER_QUERY]
+            rows = self._connection.execute(
+                f"SELECT invoice FROM policies WHERE exercise = ? AND invoice IN ({', '.join('?' * len(chunk))})",
+                (self._exercise_id, *chunk)
+            )
+            res.update(invoice for invoice, in rows)
+
+        return res
+
+    @timed("exercise.account_balances")
+    def account_balances(self) -> dict[int, AccountMovement]:
+        res = {}
+        rows = self._connection.execute(
+            "SELECT accounts.account_id, "
+            "COALESCE(SUM(CASE movements.d_c WHEN 'C' THEN movements.cents END), 0), "
+            "COALESCE(SUM(CASE movements.d_c WHEN 'D' THEN movements.cents END), 0) "
+            "FROM accounts LEFT JOIN movements ON movements.exercise = accounts.exercise AND movements.account_id = accounts.account_id "
+            "WHERE accounts.exercise = ? GROUP BY accounts.account_id ORDER BY accounts.account_id / 100000, accounts.rowid",
+            (self._exercise_id,)
+        )
+
+        for account_id, credit_balance, debit_balance in rows:
+            # Assets and Expenses are debtor, the rest of the statements are creditor
+            nature = "D" if account_id // 100000 in (1, 5) else "C"
+
+            if credit_balance > debit_balance:
+                res[account_id] = AccountMovement(000000, Money.from_cents(credit_balance - debit_balance), "C")
+            elif debit_balance > credit_balance:
+                res[account_id] = AccountMovement(000000, Money.from_cents(debit_balance - credit_balance), "D")
+            else:
+                res[account_id] = AccountMovement(000000, Money.from_cents(0), nature)
+
+        return res
+
+    def trial_balance(self) -> Iterator[tuple[int, str, Money, Money, Money]]:
+        rows = self._connection.execute(
+            "SELECT accounts.account_id, accounts.name, "
+            "COALESCE(SUM(CASE movements.d_c WHEN 'D' THEN movements.cents END), 0), "
+            "COALESCE(SUM(CASE movements.d_c WHEN 'C' THEN movements.cents END), 0) "
+            "FROM accounts LEFT JOIN movements ON movements.exercise = accounts.exercise AND movements.account_id = accounts.account_id "
+            "WHERE accounts.exercise = ? GROUP BY accounts.account_id ORDER BY accounts.account_id / 100000, accounts.rowid",
+            (self._exercise_id,)
+        )
+
+        for account_id, name, debit_balance, credit_balance in rows:
+            balance = debit_balance - credit_balance
+
+            yield account_id, name, Money.from_cents(debit_balance), Money.from_cents(credit_balance), Money.from_cents(balance if STATEMENTS[account_id // 100000 - 1][1] == "d" else -balance)
+
+    def general_ledger(self) -> Iterator[tuple[int, str, datetime, int, str, Money, Money, Money]]:
+        # The cursor is read one row at a time, the running balance is the only state kept per account
+        rows = self._connection.execute(
+            "SELECT accounts.account_id, accounts.name, policies.date, policies.invoice, policies.description, movements.cents, movements.d_c "
+            "FROM accounts JOIN movements ON movements.exercise = accounts.exercise AND movements.account_id = accounts.account_id "
+            "JOIN policies ON policies.exercise = movements.exercise AND policies.invoice = movements.invoice "
+            "WHERE accounts.exercise = ? ORDER BY accounts.account_id / 100000, accounts.rowid, movements.rowid",
+            (self._exercise_id,)
+        )
+
+        for (account_id, name), movements in groupby(rows, lambda row: row[:2]):
+            sign = 1 if STATEMENTS[account_id // 100000 - 1][1] == "d" else -1
+            balance = 0
+
+            for _, _, date, invoice, description, cents, d_c in movements:
+                cents = cents if d_c == "D" else -cents
+                balance += sign * cents
+
+                yield account_id, name, datetime.fromisoformat(date), invoice, description, Money.from_cents(max(cents, 0)), Money.from_cents(max(-cents, 0)), Money.from_cents(balance)
+
+    def _report_statements(self) -> Iterator[Statement]:
+        # Only one statement at a time is loaded in memory while the report is rendered
+        for number, (name, nature) in enumerate(STATEMENTS):
+            statement = Statement(name, nature)
+
+            for account_id, account_name in self._connection.execute("SELECT account_id, name FROM accounts WHERE exercise = ? AND account_id / 100000 = ?", (self._exercise_id, number + 1)):
+                statement.add_account(account_id, account_name)
+
+            for account_id, cents, d_c in self._connection.execute("SELECT account_id, cents, d_c FROM movements WHERE exercise = ? AND account_id / 100000 = ? ORDER BY rowid", (self._exercise_id, number + 1)):
+                statement.account_movement(AccountMovement(account_id, Money.from_cents(cents), d_c))
+
+            yield statement
+
+    def _account_names(self) -> Iterable[tuple[int, str]]:
+        return self._connection.execute("SELECT account_id, name FROM accounts WHERE exercise = ?", (self._exercise_id,)).fetchall()
+
+    def _chart_of_accounts(self) -> ChartOfAccounts:
+        # The chart is rebuilt from one aggregate per account, the movements are summed by SQLite
+        chart = ChartOfAccounts(STATEMENTS)
+
+        for group_id, name in self._connection.execute("SELECT group_id, name FROM groups WHERE exercise = ?", (self._exercise_id,)):
+            chart.add_group(group_id, name)
+
+        for account_id, name in self._connection.execute("SELECT account_id, name FROM accounts WHERE exercise = ?", (self._exercise_id,)):
+            chart.add_account(account_id, name)
+
+        for account_id, cents in self._connection.execute("SELECT account_id, SUM(CASE d_c WHEN 'D' THEN cents ELSE -cents END) FROM movements WHERE exercise = ? GROUP BY account_id", (self._exercise_id,)):
+            chart.record(account_id, cents)
+
+        return chart
+
+    def _report_policies(self) -> Iterator[Policy]:
+        rows = self._connection.execute(
+            "SELECT policies.invoice, policies.description, policies.date, movements.account_id, movements.cents, movements.d_c "
+            "FROM policies JOIN movements ON movements.exercise = policies.exercise AND movements.invoice = policies.invoice "
+            "WHERE policies.exercise = ? ORDER BY policies.invoice, movements.rowid",
+            (self._exercise_id,)
+        )
+
+        for (invoice, description, date), movements in groupby(rows, lambda row: row[:3]):
+            debits = []
+            credits = []
+
+            for *_, account_id, cents, d_c in movements:
+                (debits if d_c == "D" else credits).append(AccountMovement(account_id, Money.from_cents(cents), d_c))
+
+            yield Policy(invoice, description, datetime.fromisoformat(date), debits, credits)
+
+    @timed("exercise.statement_balances")
+    def _statement_balances(self, as_of: datetime = None) -> list[Money]:
+        balances = [Money(0)] * 5
+
+        if as_of is None:
+            rows = self._connection.execute(
+                "SELECT account_id / 100000, SUM(CASE d_c WHEN 'D' THEN cents ELSE -cents END) FROM movements WHERE exercise = ? GROUP BY account_id / 100000",
+                (self._exercise_id,)
+            )
+        else:
+            rows = self._connection.execute(
+                "SELECT movements.account_id / 100000, SUM(CASE movements.d_c WHEN 'D' THEN movements.cents ELSE -movements.cents END) "
+                "FROM movements JOIN policies ON policies.exercise = movements.exercise AND policies.invoice = movements.invoice "
+                "WHERE movements.exercise = ? AND policies.date <= ? GROUP BY movements.account_id / 100000",
+                (self._exercise_id, as_of.isoformat())
+            )
+
+        for statement, debit_balance in rows:
+            # Assets and Expenses are debtor, the rest of the statements are creditor
+            balances[statement - 1] = Money.from_cents(debit_balance if statement in (1, 5) else -debit_balance)
+
+        return balances
+
+
+class SQLiteLedger:
+
+    """
+        SQLite storage backend for exercises.
+
+        Exposes the same methods as the Journal so the GUI can use either of them. Every change made through a
+        SQLiteExercise is committed immediately, so the journal-style hooks only need to commit.
+
+        Attributes:
+        -----------
+        path : str
+            The database directory.
+
+        Methods:
+        --------
+        __init__(path: str):
+            Opens (or creates) the ledger database in the given directory.
+        catalog() -> list[CatalogEntry]:
+            Returns the catalog entries of all the exercises, oldest first.
+            Imports the legacy 'database.pickle' file if the ledger is empty.
+        open_exercise(name: str) -> SQLiteExercise:
+            Returns the exercise with the given name without loading its contents.
+            Raises exception if the exercise doesn't exist.
+        read_exercise(name: str) -> SQLiteExercise:
+            Same as open_exercise, SQLite already lets several processes read the ledger at once.
+            Raises exception if the exercise doesn't exist.
+        release(exercise: Exercise) -> None:
+            Commits any pending change of the exercise.
+        new_exercise(company_name: str, name: str) -> SQLiteExercise:
+            Creates a new empty exercise in the ledger.
+            Raises exception if the exercise's name already exists.
+        import_exercise(exercise: Exercise) -> SQLiteExercise:
+            Copies an in-memory exercise into the ledger.
+        create_exercise(exercise: Exercise) -> None:
+            Copies the exercise into the ledger unless it's already stored in it.
+        add_account(exercise: Exercise, account_id: int, name: str) -> None:
+            Nothing to do, the account was already written by the exercise.
+        add_group(exercise: Exercise, group_id: int, name: str) -> None:
+            Nothing to do, the group was already written by the exercise.
+        add_policy(exercise: Exercise, policy: Policy) -> None:
+            Nothing to do, the policy was already written by the exercise.
+        add_policies(exercise: Exercise, policies: list[Policy]) -> None:
+            Nothing to do, the policies were already written by the exercise.
+        snapshot(exercise: Exercise) -> None:
+            Commits any pending change.
+        autosave() -> list[str]:
+            Commits any pending change, nothing is ever left dirty in the ledger.
+        close() -> None:
+            Closes the database connection.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+
+        os.makedirs(self._path, exist_ok=True)
+
+        # The GUI writes from its worker thread and reads from the main loop, the worker serializes the writes
+        self._connection = sqlite3.connect(os.path.join(self._path, "database.sqlite3"), check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, path: str) -> None:
+        pass
+
+    def catalog(self) -> list[CatalogEntry]:
+        if self._connection.execute("SELECT COUNT(*) FROM exercises").fetchone()[0] == 0 and os.path.exists(os.path.join(self._path, "database.pickle")):
+            with open(os.path.join(self._path, "database.pickle"), "rb") as f:
+                for exercise in pickle.load(f):
+                    self.import_exercise(exercise)
+
+        rows = self._connection.execute(
+            "SELECT company_name, name, created, (SELECT COUNT(*) FROM policies WHERE policies.exercise = exercises.id) FROM exercises ORDER BY created"
+        )
+
+        return [CatalogEntry(company_name, name, datetime.fromisoformat(created), policies) for company_name, name, created, policies in rows]
+
+    def open_exercise(self, name: str) -> SQLiteExercise:
+        row = self._connection.execute("SELECT id, company_name, name, created FROM exercises WHERE name = ?", (name,)).fetchone()
+
+        if row is None:
+            raise Exception("ERROR: Exercise '" + name + "' doesn't exist.")
+
+        return SQLiteExercise(self._connection, row[0], row[1], row[2], datetime.fromisoformat(row[3]))
+
+    def read_exercise(self, name: str) -> SQLiteExercise:
+        return self.open_exercise(name)
+
+    def release(self, exercise: Exercise) -> None:
+        self._connection.commit()
+
+    def new_exercise(self, company_name: str, name: str) -> SQLiteExercise:
+        created = datetime.now()
+
+        try:
+            with self._connection:
+                cursor = self._connection.execute("INSERT INTO exercises (company_name, name, created) VALUES (?, ?, ?)", (company_name, name, created.isoformat()))
+        except sqlite3.IntegrityError:
+            raise Exception("ERROR: Exercise '" + name + "' already exists.")
+
+        return SQLiteExercise(self._connection, cursor.lastrowid, company_name, name, created)
+
+    @timed("sqlite.import")
+    def import_exercise(self, exercise: Exercise) -> SQLiteExercise:
+        res = self.new_exercise(exercise.company_name, exercise.name)
+        res._exercise = exercise.exercise
+
+        with self._connection:
+            self._connection.execute("UPDATE exercises SET created = ? WHERE id = ?", (res.exercise.isoformat(), res.exercise_id))
+
+        for group_id, name in exercise.groups().items():
+            res.add_group(group_id, name)
+
+        for statement in exercise.statements:
+            for account in statement.accounts.values():
+                res.add_account(account.account_id, account.name)
+
+        # A single batch, so the whole exercise is copied in one transaction
+        res.post_many(list(exercise.policies))
+
+        return res
+
+    def create_exercise(self, exercise: Exercise) -> None:
+        if not isinstance(exercise, SQLiteExercise):
+            self.import_exercise(exercise)
+
+    def add_account(self, exercise: Exercise, account_id: int, name: str) -> None:
+        pass
+
+    def add_group(self, exercise: Exercise, group_id: int, name: str) -> None:
+        pass
+
+    def add_policy(self, exercise: Exercise, policy: Policy) -> None:
+        pass
+
+    def add_policies(self, exercise: Exercise, policies: list[Policy]) -> None:
+        pass
+
+    @timed("sqlite.commit")
+    def snapshot(self, exercise: Exercise) -> None:
+        self._connection.commit()
+
+    def autosave(self) -> list[str]:
+        self._connection.commit()
+
+        return []
+
+    def close(self) -> None:
+        self._connection.commit()
+        self._connection.close()
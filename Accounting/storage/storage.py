@@ -0,0 +1,21 @@
+from Accounting.storage.journal import Journal
+
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    from Accounting.storage.sqlite import SQLiteLedger
+
+
+# The SQLite backend is only imported when it's opened, so the journal doesn't pay for sqlite3
+Storage = Union[Journal, "SQLiteLedger"]
+
+
+def open_storage(backend: str, path: str, snapshot_interval: int = 500) -> Storage:
+    if backend == "journal":
+        return Journal(path, snapshot_interval)
+    elif backend == "sqlite":
+        from Accounting.storage.sqlite import SQLiteLedger
+
+        return SQLiteLedger(path)
+    else:
+        raise Exception("ERROR: Storage backend '" + backend + "' isn't a valid option.")